@@ -1,17 +1,49 @@
+from __future__ import annotations
+
 import sys
 import argparse
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Set
 import re
 
 from src.config import LOG_LEVEL
-from src.utils import setup_logging, print_summary
-from src.ingestion import run_ingestion
-from src.snowflake_dal import SnowflakeDAL
-from src.raw_loader import run_raw_data_pipeline
+from src.utils import setup_logging, print_summary, format_banner
+
+# Heavy modules (snowflake.connector, httpx) are imported inside the steps
+# that use them, so e.g. '--step ingest' never loads the Snowflake driver
+if TYPE_CHECKING:
+    from src.snowflake_dal import SnowflakeDAL
+
+
+logger = logging.getLogger(__name__)
 
 
-logger = setup_logging(LOG_LEVEL)
+# Pipeline DAG: step -> steps it depends on.
+# 'ingest' only talks to the API, so it runs alongside the Snowflake setup.
+STEP_DEPENDENCIES: Dict[str, Set[str]] = {
+    'setup-snowflake': set(),
+    'ingest': set(),
+    'load-raw': {'setup-snowflake', 'ingest'},
+    'setup-dbo': {'setup-snowflake'},
+    'transform': {'load-raw', 'setup-dbo'},
+    'quality': {'transform'},
+}
+
+# Steps that need a Snowflake connection
+SNOWFLAKE_STEPS: Set[str] = {'setup-snowflake', 'load-raw', 'setup-dbo', 'transform', 'quality'}
+
+# Step -> key in the pipeline results dictionary
+STEP_RESULT_KEYS: Dict[str, str] = {
+    'setup-snowflake': 'snowflake_setup',
+    'ingest': 'ingestion',
+    'load-raw': 'load_raw',
+    'setup-dbo': 'setup_dbo',
+    'transform': 'transformation',
+    'quality': 'quality',
+}
 
 
 def parse_arguments():
@@ -21,14 +53,19 @@ def parse_arguments():
     Returns:
         Parsed arguments
     """
+    # Fast path for the default (cron/CI) invocation: skip building the parser
+    if len(sys.argv) == 1:
+        return argparse.Namespace(step='all', force_refresh=False, log_level=LOG_LEVEL)
+    
     parser = argparse.ArgumentParser(
         description="Rick and Morty Data Pipeline",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
                 Examples:
-                python main.py                            # Run full pipeline
+                python main.py                            # Run full pipeline (independent steps run concurrently)
                 python main.py --step setup-snowflake     # Setup Snowflake database
-                python main.py --step ingest              # Run only ingestion
+                python main.py --step ingest              # Run only ingestion (no Snowflake connection)
+                python main.py --step ingest --force-refresh  # Refetch even if the API data is unchanged
                 python main.py --step load-raw            # Load JSON into RAW tables
                 python main.py --step setup-dbo           # Create DBO tables
                 python main.py --step transform           # Run only transformation
@@ -43,11 +80,17 @@ def parse_arguments():
         help='Pipeline step to execute (default: all)'
     )
     
+    parser.add_argument(
+        '--force-refresh',
+        action='store_true',
+        help='Ignore cached API data (ETag) and refetch all pages'
+    )
+    
     parser.add_argument(
         '--log-level',
         choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
-        default='INFO',
-        help='Logging level (default: INFO)'
+        default=LOG_LEVEL,
+        help='Logging level (default: LOG_LEVEL from .env, INFO if unset)'
     )
     
     return parser.parse_args()
@@ -63,8 +106,7 @@ def run_snowflake_setup_step(dal: SnowflakeDAL):
     Returns:
         True if successful
     """
-    logger.info("STEP: Snowflake Database Setup")
-    logger.info("-" * 60)
+    logger.info("STEP: Snowflake Database Setup\n" + "-" * 60)
     
     try:
         # Test connection first
@@ -96,18 +138,23 @@ def run_snowflake_setup_step(dal: SnowflakeDAL):
         raise
 
 
-def run_ingestion_step():
+def run_ingestion_step(force_refresh: bool = False, in_memory: bool = False):
     """
     Execute the ingestion step.
     
+    Args:
+        force_refresh: Refetch even if the API data is unchanged
+        in_memory: Keep the RAW documents in memory instead of writing files
+    
     Returns:
         Ingested data dictionary
     """
-    logger.info("STEP: Data Ingestion")
-    logger.info("-" * 60)
+    logger.info("STEP: Data Ingestion\n" + "-" * 60)
     
     try:
-        data = run_ingestion()
+        from src.ingestion import run_ingestion
+        
+        data = run_ingestion(force_refresh=force_refresh, in_memory=in_memory)
         logger.info("✓ Ingestion step completed successfully")
         return data
     except Exception as e:
@@ -115,21 +162,23 @@ def run_ingestion_step():
         raise
 
 
-def run_load_raw_step(dal: SnowflakeDAL):
+def run_load_raw_step(dal: SnowflakeDAL, payloads: Optional[Dict[str, Any]] = None):
     """
     Execute the load raw data step.
     
     Args:
         dal: SnowflakeDAL instance
+        payloads: In-memory RAW documents from the ingestion step (None reads files)
     
     Returns:
         Load results dictionary
     """
-    logger.info("STEP: Load RAW Data into snowflake")
-    logger.info("-" * 60)
+    logger.info("STEP: Load RAW Data into snowflake\n" + "-" * 60)
     
     try:
-        results = run_raw_data_pipeline(dal)
+        from src.raw_loader import run_raw_data_pipeline
+        
+        results = run_raw_data_pipeline(dal, payloads)
         logger.info("✓ Load RAW step completed successfully")
         return results
     except Exception as e:
@@ -147,13 +196,13 @@ def run_setup_dbo_step(dal: SnowflakeDAL):
     Returns:
         True if successful
     """
-    logger.info("STEP: Setup DBO Tables")
-    logger.info("-" * 60)
+    logger.info("STEP: Setup DBO Tables\n" + "-" * 60)
     
     try:
         # Execute DBO tables DDL
         logger.info("Creating DBO dimension and bridge tables...")
-        dal.execute_file("sql/03_dbo_tables.sql")
+        # Dimension tables are created concurrently (async queries)
+        dal.execute_file_async("sql/03_dbo_tables.sql")
         
         # Verify tables were created
         logger.info("\nVerifying DBO tables...")
@@ -179,8 +228,7 @@ def run_transformation_step(dal: SnowflakeDAL):
     Returns:
         Dictionary with transformation results
     """
-    logger.info("STEP: Transform RAW → DBO")
-    logger.info("-" * 60)
+    logger.info("STEP: Transform RAW → DBO\n" + "-" * 60)
     
     try:
         # Execute transformation SQL (MERGE statements)
@@ -218,8 +266,7 @@ def run_quality_checks_step(dal: SnowflakeDAL):
     Returns:
         Quality check results dictionary
     """
-    logger.info("STEP: Data Quality Checks")
-    logger.info("-" * 60)
+    logger.info("STEP: Data Quality Checks\n" + "-" * 60)
     
     try:
         from src.quality_checks import run_quality_checks
@@ -227,7 +274,7 @@ def run_quality_checks_step(dal: SnowflakeDAL):
         results = run_quality_checks(dal)
         
         # Check if any tests failed
-        if results['failed']:
+        if len(results['failed']):
             logger.error(f"\n✗ Quality checks failed: {len(results['failed'])} check(s) failed")
             raise Exception(f"Data quality validation failed: {len(results['failed'])} checks failed")
         
@@ -239,24 +286,114 @@ def run_quality_checks_step(dal: SnowflakeDAL):
         raise
 
 
+def build_step_runners(
+    dal: Optional[SnowflakeDAL],
+    force_refresh: bool = False,
+    results: Optional[Dict[str, Any]] = None
+) -> Dict[str, Callable[[], Any]]:
+    """
+    Map each pipeline step to a zero-argument callable executing it.
+    
+    Args:
+        dal: SnowflakeDAL instance (None if only 'ingest' is run)
+        force_refresh: Passed to the ingestion step
+        results: Shared results of the running pipeline. When given, ingestion
+                 keeps its output in memory and load-raw uploads it from there
+                 (no local file round-trip)
+    
+    Returns:
+        Dictionary of step name -> callable
+    """
+    in_memory = results is not None
+    
+    def load_raw():
+        payloads = results.get('ingestion', {}).get('payloads') if in_memory else None
+        return run_load_raw_step(dal, payloads)
+    
+    return {
+        'setup-snowflake': lambda: run_snowflake_setup_step(dal),
+        'ingest': lambda: run_ingestion_step(force_refresh, in_memory),
+        'load-raw': load_raw,
+        'setup-dbo': lambda: run_setup_dbo_step(dal),
+        'transform': lambda: run_transformation_step(dal),
+        'quality': lambda: run_quality_checks_step(dal),
+    }
+
+
+async def run_pipeline_dag(dal: SnowflakeDAL, force_refresh: bool = False) -> Dict[str, Any]:
+    """
+    Execute all pipeline steps following STEP_DEPENDENCIES.
+    
+    Each step starts as soon as its dependencies have completed, so
+    independent steps (e.g. ingest and setup-snowflake) run concurrently.
+    Steps are blocking (Snowflake connector, own event loop for ingestion)
+    and are dispatched to a thread pool; Snowflake steps borrow a pooled
+    connection so concurrent steps don't share a session.
+    
+    Args:
+        dal: SnowflakeDAL instance
+        force_refresh: Passed to the ingestion step
+    
+    Returns:
+        Dictionary with results keyed by STEP_RESULT_KEYS
+    
+    Raises:
+        Exception: The first step failure (dependent steps are not started)
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=len(STEP_DEPENDENCIES), thread_name_prefix='pipeline')
+    results: Dict[str, Any] = {}
+    runners = build_step_runners(dal, force_refresh, results)
+    tasks: Dict[str, asyncio.Task] = {}
+    
+    def run_in_session(step: str) -> Any:
+        if step not in SNOWFLAKE_STEPS:
+            return runners[step]()
+        with dal.borrow():
+            return runners[step]()
+    
+    async def run_step(step: str, dependencies: list):
+        await asyncio.gather(*dependencies)
+        results[STEP_RESULT_KEYS[step]] = await loop.run_in_executor(executor, run_in_session, step)
+    
+    def schedule(step: str) -> asyncio.Task:
+        if step not in tasks:
+            dependencies = [schedule(dep) for dep in sorted(STEP_DEPENDENCIES[step])]
+            tasks[step] = asyncio.create_task(run_step(step, dependencies))
+        return tasks[step]
+    
+    try:
+        for step in STEP_DEPENDENCIES:
+            schedule(step)
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        # Don't start anything downstream of the failure
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    finally:
+        # Wait for steps already running in worker threads
+        executor.shutdown(wait=True)
+    
+    # Keep results in pipeline order
+    return {key: results[key] for key in STEP_RESULT_KEYS.values() if key in results}
+
+
 def main():
     """
     Main pipeline orchestration.
     """
     args = parse_arguments()
     
-    # Update log level if specified
-    if args.log_level:
-        logging.getLogger().setLevel(getattr(logging, args.log_level))
+    # Configure logging once for the whole pipeline
+    setup_logging(args.log_level)
     
-    logger.info("")
-    logger.info("=" * 60)
-    logger.info("  RICK AND MORTY DATA PIPELINE")
-    logger.info("=" * 60)
-    logger.info(f"  Step: {args.step}")
-    logger.info(f"  Log Level: {args.log_level}")
-    logger.info("=" * 60)
-    logger.info("")
+    logger.info(format_banner(
+        "  RICK AND MORTY DATA PIPELINE",
+        f"  Step: {args.step}",
+        f"  Log Level: {args.log_level}"
+    ) + "\n")
     
     # Create DAL once for the entire pipeline
     dal = None
@@ -264,47 +401,30 @@ def main():
     try:
         
         # Initialize DAL for steps that need Snowflake connection
-        needs_dal = args.step in ['setup-snowflake', 'load-raw', 'setup-dbo', 'transform', 'quality', 'all']
+        needs_dal = args.step == 'all' or args.step in SNOWFLAKE_STEPS
         if needs_dal:
+            from src.snowflake_dal import SnowflakeDAL
+            
             logger.info("Initializing Snowflake connection...")
             dal = SnowflakeDAL()
             logger.info("")
         
-        results = {}
-        
         # Execute requested steps
-        if args.step in ['setup-snowflake', 'all']:
-            results['snowflake_setup'] = run_snowflake_setup_step(dal)
-        
-        if args.step in ['ingest', 'all']:
-            results['ingestion'] = run_ingestion_step()
-        
-        if args.step in ['load-raw', 'all']:
-            results['load_raw'] = run_load_raw_step(dal)
-        
-        if args.step in ['setup-dbo', 'all']:
-            results['setup_dbo'] = run_setup_dbo_step(dal)
-        
-        if args.step in ['transform', 'all']:
-            results['transformation'] = run_transformation_step(dal)
-        
-        if args.step in ['quality', 'all']:
-            results['quality'] = run_quality_checks_step(dal)
+        if args.step == 'all':
+            results = asyncio.run(run_pipeline_dag(dal, args.force_refresh))
+        else:
+            runners = build_step_runners(dal, args.force_refresh)
+            results = {STEP_RESULT_KEYS[args.step]: runners[args.step]()}
         
         # Final summary
-        logger.info("")
-        logger.info("=" * 60)
-        logger.info("  PIPELINE EXECUTION COMPLETE")
-        logger.info("=" * 60)
-        
+        summary = []
         if 'ingestion' in results and results['ingestion']:
             data = results['ingestion']
-            logger.info(f"  ✓ Characters ingested: {len(data.get('characters', []))}")
-            logger.info(f"  ✓ Episodes ingested: {len(data.get('episodes', []))}")
+            summary.append(f"  ✓ Characters ingested: {len(data.get('characters', []))}")
+            summary.append(f"  ✓ Episodes ingested: {len(data.get('episodes', []))}")
+        summary.append("  ✓ Pipeline completed successfully!")
         
-        logger.info("  ✓ Pipeline completed successfully!")
-        logger.info("=" * 60)
-        logger.info("")
+        logger.info(format_banner("  PIPELINE EXECUTION COMPLETE", *summary) + "\n")
         
         return 0
     
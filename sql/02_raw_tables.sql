@@ -4,17 +4,19 @@ USE DATABASE RICK_MORTY_DB;
 
 USE SCHEMA RAW;
 
-CREATE OR REPLACE FILE FORMAT json_format
+-- COMPRESSION = AUTO reads the zstd (.json.zst) files written by ingestion
+-- as well as gzip files compressed by PUT
+CREATE OR REPLACE FILE FORMAT RAW.json_format
     TYPE = 'JSON'
     COMPRESSION = 'AUTO'
     STRIP_OUTER_ARRAY = FALSE;
 
-CREATE OR REPLACE STAGE raw_data_stage
-    FILE_FORMAT = json_format
+CREATE OR REPLACE STAGE RAW.raw_data_stage
+    FILE_FORMAT = RAW.json_format
     COMMENT = 'Internal stage for loading raw JSON files';
 
 DROP TABLE IF EXISTS RAW.characters;
-CREATE TABLE characters (
+CREATE TABLE RAW.characters (
     id INTEGER NOT NULL,
     raw_data VARIANT NOT NULL,
     ingested_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
@@ -23,7 +25,7 @@ CREATE TABLE characters (
 );
 
 DROP TABLE IF EXISTS RAW.episodes;
-CREATE TABLE episodes (
+CREATE TABLE RAW.episodes (
     id INTEGER NOT NULL,
     raw_data VARIANT NOT NULL,
     ingested_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
@@ -2,8 +2,14 @@ USE DATABASE RICK_MORTY_DB;
 
 USE SCHEMA DBO;
 
+-- Drop everything first (bridge before the tables it references), so the
+-- dimension tables below are independent and can be created concurrently
+DROP TABLE IF EXISTS DBO.bridge_character_episodes;
+
 DROP TABLE IF EXISTS DBO.dim_characters CASCADE;
 
+DROP TABLE IF EXISTS DBO.dim_episodes CASCADE;
+
 CREATE TABLE DBO.dim_characters (
     id INTEGER NOT NULL,
     name VARCHAR(500) NOT NULL,
@@ -22,8 +28,6 @@ CREATE TABLE DBO.dim_characters (
     CONSTRAINT dim_characters_pk PRIMARY KEY (id)
 );
 
-DROP TABLE IF EXISTS DBO.dim_episodes CASCADE;
-
 CREATE TABLE DBO.dim_episodes (
     id INTEGER NOT NULL,
     name VARCHAR(255) NOT NULL,
@@ -35,8 +39,6 @@ CREATE TABLE DBO.dim_episodes (
     CONSTRAINT dim_episodes_pk PRIMARY KEY (id)
 );
 
-DROP TABLE IF EXISTS DBO.bridge_character_episodes;
-
 CREATE TABLE DBO.bridge_character_episodes (
     character_id INTEGER NOT NULL,
     episode_id INTEGER NOT NULL,
@@ -44,8 +46,8 @@ CREATE TABLE DBO.bridge_character_episodes (
     CONSTRAINT bridge_character_episodes_pk PRIMARY KEY (character_id, episode_id),
     CONSTRAINT fk_character 
         FOREIGN KEY (character_id) 
-        REFERENCES dim_characters(id),
+        REFERENCES DBO.dim_characters(id),
     CONSTRAINT fk_episode 
         FOREIGN KEY (episode_id) 
-        REFERENCES dim_episodes(id)
+        REFERENCES DBO.dim_episodes(id)
 );
\ No newline at end of file
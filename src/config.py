@@ -19,6 +19,8 @@ RICK_MORTY_API_BASE_URL = os.getenv("RICK_MORTY_API_BASE_URL", "https://rickandm
 API_TIMEOUT = int(os.getenv("API_TIMEOUT", "30"))
 API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "5"))
 API_RETRY_BACKOFF = int(os.getenv("API_RETRY_BACKOFF", "2"))
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "8"))  # Max in-flight page requests per entity
+API_RATE_LIMIT = float(os.getenv("API_RATE_LIMIT", "20"))  # Max requests per second, shared by all entities
 
 # API Endpoints
 CHARACTERS_ENDPOINT = f"{RICK_MORTY_API_BASE_URL}/character"
@@ -29,12 +31,19 @@ SNOWFLAKE_CONFIG = {
     "account": os.getenv("SNOWFLAKE_ACCOUNT"),
     "user": os.getenv("SNOWFLAKE_USER"),
     "password": os.getenv("SNOWFLAKE_PASSWORD"),
+    "private_key_path": os.getenv("SNOWFLAKE_PRIVATE_KEY_PATH"),  # Key-pair auth (used instead of password when set)
+    "private_key_passphrase": os.getenv("SNOWFLAKE_PRIVATE_KEY_PASSPHRASE"),
     "warehouse": os.getenv("SNOWFLAKE_WAREHOUSE", "COMPUTE_WH"),
     "database": os.getenv("SNOWFLAKE_DATABASE", "RICK_MORTY_DB"),
     "schema": os.getenv("SNOWFLAKE_SCHEMA", "RAW"),
     "role": os.getenv("SNOWFLAKE_ROLE", "ACCOUNTADMIN"),
+    "ocsp_cache_file": os.getenv("SNOWFLAKE_OCSP_CACHE_FILE"),  # Optional persistent OCSP response cache
 }
 
+SNOWFLAKE_POOL_SIZE = int(os.getenv("SNOWFLAKE_POOL_SIZE", "3"))  # Connections shared by concurrent pipeline steps
+SNOWFLAKE_PUT_PARALLEL = int(os.getenv("SNOWFLAKE_PUT_PARALLEL", "8"))  # Parallel upload threads per PUT (1-99)
+SNOWFLAKE_LOAD_WAREHOUSE_SIZE = os.getenv("SNOWFLAKE_LOAD_WAREHOUSE_SIZE", "")  # e.g. MEDIUM; empty = don't resize (previous size is restored after)
+
 # Snowflake Schemas
 RAW_SCHEMA = "RAW"
 DBO_SCHEMA = "DBO"
@@ -51,9 +60,12 @@ def validate_config():
     Returns:
         tuple: (is_valid, missing_keys)
     """
-    required_keys = ["account", "user", "password", "warehouse"]
+    required_keys = ["account", "user", "warehouse"]
     missing = [key for key in required_keys if not SNOWFLAKE_CONFIG.get(key)]
     
+    if not SNOWFLAKE_CONFIG.get("password") and not SNOWFLAKE_CONFIG.get("private_key_path"):
+        missing.append("password")
+    
     return len(missing) == 0, missing
 
 
@@ -78,6 +90,8 @@ if __name__ == "__main__":
     print(f"Episodes Endpoint: {EPISODES_ENDPOINT}")
     print(f"API Timeout: {API_TIMEOUT}s")
     print(f"Max Retries: {API_MAX_RETRIES}")
+    print(f"Max Concurrency: {API_MAX_CONCURRENCY}")
+    print(f"Rate Limit: {API_RATE_LIMIT} req/s")
     print(f"Raw Data Path: {RAW_DATA_PATH}")
     print("\nSnowflake Configuration:")
     is_valid, missing = validate_config()
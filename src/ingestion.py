@@ -1,23 +1,34 @@
 """
 Data ingestion module for Rick and Morty API.
-Handles API requests with pagination, retry logic, and exponential backoff.
+Handles concurrent API requests with pagination, retry logic, and exponential backoff.
 """
 
-import json
+import asyncio
+import heapq
 import logging
+import os
 import time
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
-from glob import glob
 
-import requests
-from tenacity import (retry, stop_after_attempt, wait_exponential,retry_if_exception_type,before_sleep_log)
+import httpx
+from aiolimiter import AsyncLimiter
+from tenacity import (retry, stop_after_attempt, wait_exponential,retry_if_exception_type,RetryCallState)
 
-from .config import (CHARACTERS_ENDPOINT,EPISODES_ENDPOINT,API_TIMEOUT,API_MAX_RETRIES,API_RETRY_BACKOFF,RAW_DATA_PATH)
-from .utils import setup_logging, save_json_to_file, get_timestamp, print_summary
+from .config import (CHARACTERS_ENDPOINT,EPISODES_ENDPOINT,API_TIMEOUT,API_MAX_RETRIES,API_RETRY_BACKOFF,API_MAX_CONCURRENCY,API_RATE_LIMIT,RAW_DATA_PATH,LOG_LEVEL)
+from .utils import setup_logging, scan_files, save_json_to_file, load_json_from_file, serialize_json, zstd_compress, get_timestamp, print_summary, format_banner
 
 
-logger = setup_logging()
+logger = logging.getLogger(__name__)
+
+# Token bucket shared by every client/entity, so concurrent fetches stay
+# within one request budget against the API; see _get_rate_limiter()
+_RATE_LIMITER: Optional[AsyncLimiter] = None
+_RATE_LIMITER_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+# Shared HTTP client (connection pool, TLS session, DNS cache); see _get_http_client()
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+_HTTP_CLIENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
 
 
 class APIIngestionError(Exception): #todo: not sure we need it
@@ -25,6 +36,23 @@ class APIIngestionError(Exception): #todo: not sure we need it
     pass
 
 
+def find_latest_file(directory: Path, pattern: str) -> Optional[Path]:
+    """
+    Find the most recently modified file matching a pattern.
+    
+    Args:
+        directory: Directory to search
+        pattern: File pattern to match (e.g., 'characters_*.json')
+    
+    Returns:
+        Path to the latest file, or None if no file matches
+    """
+    files = scan_files(directory, pattern)
+    if not files:
+        return None
+    return Path(max(files)[1])
+
+
 def cleanup_old_files(directory: Path, pattern: str, keep_latest: int = 1):
     """
     Remove old files from directory, keeping only the most recent ones.
@@ -34,178 +62,372 @@ def cleanup_old_files(directory: Path, pattern: str, keep_latest: int = 1):
         pattern: File pattern to match (e.g., 'characters_*.json')
         keep_latest: Number of latest files to keep
     """
-    files = sorted(
-        glob(str(directory / pattern)),
-        key=lambda x: Path(x).stat().st_mtime,
-        reverse=True
-    )
+    files = scan_files(directory, pattern)
+    keep = {path for _, path in heapq.nlargest(keep_latest, files)}
     
     # Delete all but the latest N files
-    files_to_delete = files[keep_latest:]
-    
-    for file_path in files_to_delete:
+    for _, file_path in files:
+        if file_path in keep:
+            continue
         try:
-            Path(file_path).unlink()
+            os.unlink(file_path)
             logger.info(f"  Deleted old file: {Path(file_path).name}")
         except Exception as e:
             logger.warning(f"  Failed to delete {file_path}: {e}")
 
 
+def build_raw_document(endpoint: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Wrap ingested records with ingestion metadata (the RAW file layout).
+    
+    Args:
+        endpoint: API endpoint the records came from
+        records: Ingested records
+    
+    Returns:
+        Document with 'ingested_at', 'source', 'total_records' and 'data' keys
+    """
+    return {
+        "ingested_at": get_timestamp(),
+        "source": endpoint,
+        "total_records": len(records),
+        "data": records
+    }
+
+
+def raw_file_name(entity_name: str) -> str:
+    """
+    Build a timestamped RAW file name (e.g. 'characters_2024-01-01T10-00-00.json.zst').
+    RAW files are zstd-compressed JSON, ready for PUT without recompression.
+    
+    Args:
+        entity_name: Name of the entity
+    
+    Returns:
+        File name
+    """
+    timestamp = get_timestamp().replace(':', '-')
+    return f"{entity_name}_{timestamp}.json.zst"
+
+
+def _cached_payload(file_path: Path) -> Tuple[str, bytes]:
+    """
+    Build an in-memory RAW payload from a dump on disk (unchanged entity).
+    
+    Args:
+        file_path: Cached RAW file (.json.zst, or plain .json from older runs)
+    
+    Returns:
+        Tuple of (file_name, zstd_json_bytes)
+    """
+    content = file_path.read_bytes()
+    if file_path.suffix == '.zst':
+        return file_path.name, content
+    return f"{file_path.name}.zst", zstd_compress(content)
+
+
+def _count_retry(retry_state: RetryCallState) -> None:
+    """
+    tenacity before_sleep hook: count retries on the client instead of logging each one.
+    
+    Args:
+        retry_state: State of the retried call (args[0] is the client)
+    """
+    retry_state.args[0].retry_count += 1
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """
+    Return the module-level HTTP/2 client, creating it on first use.
+    
+    Every RickMortyAPIClient shares it, so connections survive across
+    entities and clients. httpx connections are bound to the event loop that
+    opened them, so a new client is created when called from a different loop
+    (e.g. a later asyncio.run()).
+    
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    global _HTTP_CLIENT, _HTTP_CLIENT_LOOP
+    
+    loop = asyncio.get_running_loop()
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed or _HTTP_CLIENT_LOOP is not loop:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            http2=True,
+            timeout=API_TIMEOUT,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+            headers={
+                'User-Agent': 'RickMorty-DataPipeline/1.0',
+                'Accept': 'application/json'
+            }
+        )
+        _HTTP_CLIENT_LOOP = loop
+    return _HTTP_CLIENT
+
+
+def _get_rate_limiter() -> AsyncLimiter:
+    """
+    Return the shared API rate limiter, creating it on first use.
+    
+    Like the HTTP client, an AsyncLimiter is bound to the event loop it is
+    used on, so a new one is created per loop (e.g. a later asyncio.run()).
+    
+    Returns:
+        Shared AsyncLimiter (API_RATE_LIMIT requests per second)
+    """
+    global _RATE_LIMITER, _RATE_LIMITER_LOOP
+    
+    loop = asyncio.get_running_loop()
+    if _RATE_LIMITER is None or _RATE_LIMITER_LOOP is not loop:
+        _RATE_LIMITER = AsyncLimiter(max_rate=API_RATE_LIMIT, time_period=1)
+        _RATE_LIMITER_LOOP = loop
+    return _RATE_LIMITER
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (call once, before its event loop ends)."""
+    global _HTTP_CLIENT, _HTTP_CLIENT_LOOP
+    
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+    _HTTP_CLIENT = None
+    _HTTP_CLIENT_LOOP = None
+
+
 class RickMortyAPIClient:
     """
-    Client for interacting with the Rick and Morty API.
-    Implements pagination, retry logic with exponential backoff.
+    Async client for interacting with the Rick and Morty API.
+    Implements concurrent pagination, retry logic with exponential backoff.
+    
+    Uses HTTP/2, so concurrent page requests are multiplexed over a single
+    TLS connection instead of one connection (and handshake) each. The
+    connection pool is shared module-wide (see _get_http_client()).
     """
     
-    def __init__(self, timeout: int = API_TIMEOUT, max_retries: int = API_MAX_RETRIES):
+    def __init__(
+        self,
+        timeout: int = API_TIMEOUT,
+        max_retries: int = API_MAX_RETRIES,
+        max_concurrency: int = API_MAX_CONCURRENCY
+    ):
         """
         Initialize the API client.
+        Must be created inside the running event loop (it borrows the shared client).
         
         Args:
             timeout: Request timeout in seconds
             max_retries: Maximum number of retry attempts
+            max_concurrency: Maximum number of in-flight page requests per entity
         """
         self.timeout = timeout
         self.max_retries = max_retries
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'RickMorty-DataPipeline/1.0',
-            'Accept': 'application/json'
-        })
+        self.max_concurrency = max_concurrency
+        self.retry_count = 0  # Retried requests, reported once in the summary
+        self.cached_files: Dict[str, Path] = {}  # Entities served from disk (ETag match)
+        self.client = _get_http_client()
     
     @retry(
         stop=stop_after_attempt(API_MAX_RETRIES),
         wait=wait_exponential(multiplier=API_RETRY_BACKOFF, min=1, max=30),
         retry=retry_if_exception_type((
-            requests.exceptions.ConnectionError,
-            requests.exceptions.Timeout,
-            requests.exceptions.HTTPError
+            httpx.TransportError,
+            httpx.HTTPStatusError
         )),
-        before_sleep=before_sleep_log(logger, logging.WARNING)
+        before_sleep=_count_retry
     )
-    def _fetch_page(self, url: str) -> Dict[str, Any]:
+    async def _request(self, url: str, etag: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
         """
-        Fetch a single page from the API with retry logic.
+        GET a page from the API with retry logic.
         
         Args:
             url: API endpoint URL
+            etag: ETag from a previous response; sent as If-None-Match
         
         Returns:
-            JSON response as dictionary
+            Tuple of (JSON response, response ETag). The JSON response is
+            None when the server answers 304 Not Modified.
         
         Raises:
             APIIngestionError: If request fails after all retries
         """
+        headers = {'If-None-Match': etag} if etag else None
+        
         try:
             logger.debug(f"Fetching URL: {url}")
-            response = self.session.get(url, timeout=self.timeout)
+            async with _get_rate_limiter():
+                response = await self.client.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                return None, etag
             response.raise_for_status()
-            
-            return response.json()
+            return response.json(), response.headers.get('ETag')
         
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             if e.response.status_code >= 500:
                 # Retry on 5xx errors
-                logger.warning(f"Server error (5xx): {e}. Retrying...")
                 raise
             else:
                 # Don't retry on 4xx errors (client errors)
                 logger.error(f"Client error (4xx): {e}")
                 raise APIIngestionError(f"HTTP error: {e}")
         
-        except requests.exceptions.RequestException as e:
+        except httpx.TransportError:
+            # Transient network errors (timeouts, connection resets) are retried by tenacity
+            raise
+        
+        except httpx.HTTPError as e:
             logger.error(f"Request failed: {e}")
             raise APIIngestionError(f"Failed to fetch data from {url}: {e}")
     
-    def fetch_all_pages(self, endpoint: str) -> List[Dict[str, Any]]:
+    async def _fetch_page(self, url: str) -> Dict[str, Any]:
         """
-        Fetch all pages from a paginated API endpoint.
+        Fetch a single page from the API with retry logic.
         
         Args:
-            endpoint: API endpoint URL (e.g., character or episode)
+            url: API endpoint URL
         
         Returns:
-            List of all records across all pages
+            JSON response as dictionary
         """
-        all_results = []
-        current_url = endpoint
-        page_number = 1
+        page, _ = await self._request(url)
+        return page
+    
+    async def _bounded_fetch(self, url: str, page_number: int, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """
+        Fetch a single page while holding a slot of the concurrency semaphore.
         
-        logger.info(f"Starting pagination from: {endpoint}")
+        Args:
+            url: Page URL
+            page_number: Page number (for logging)
+            semaphore: Semaphore bounding in-flight requests
         
-        while current_url:
+        Returns:
+            JSON response as dictionary
+        """
+        async with semaphore:
             try:
-                logger.info(f"Fetching page {page_number}...")
-                response = self._fetch_page(current_url)
-                
-                # Extract results from current page
-                results = response.get('results', [])
-                all_results.extend(results)
-                
-                # Get next page URL from pagination info
-                info = response.get('info', {})
-                current_url = info.get('next')
-                
-                logger.info(
-                    f"Page {page_number}: Retrieved {len(results)} records. "
-                    f"Total so far: {len(all_results)}"
-                )
-                
-                if current_url:
-                    page_number += 1
-                    # Small delay to be respectful to the API
-                    time.sleep(0.1)
-                else:
-                    logger.info(f"✓ Completed pagination. Total records: {len(all_results)}")
-            
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Fetching page {page_number}...")
+                response = await self._fetch_page(url)
             except Exception as e:
                 logger.error(f"Error during pagination on page {page_number}: {e}")
                 raise APIIngestionError(f"Pagination failed on page {page_number}: {e}")
         
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Page {page_number}: Retrieved {len(response.get('results', []))} records")
+        return response
+    
+    async def fetch_all_pages(self, endpoint: str, first_page: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch all pages from a paginated API endpoint.
+        
+        The first page is fetched to learn the total page count from
+        ``info.pages``; the remaining pages are then requested concurrently.
+        
+        Args:
+            endpoint: API endpoint URL (e.g., character or episode)
+            first_page: Already fetched response for page 1 (skips refetching it)
+        
+        Returns:
+            List of all records across all pages, in page order
+        """
+        logger.info(f"Starting pagination from: {endpoint}")
+        start_time = time.time()
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        if first_page is None:
+            first_page = await self._bounded_fetch(endpoint, 1, semaphore)
+        
+        all_results = list(first_page.get('results', []))
+        total_pages = first_page.get('info', {}).get('pages', 1)
+        
+        # Pages 2..N are independent, fetch them concurrently (gather keeps order)
+        page_urls = [f"{endpoint}?page={page}" for page in range(2, total_pages + 1)]
+        pages = await asyncio.gather(*[
+            self._bounded_fetch(url, page_number, semaphore)
+            for page_number, url in enumerate(page_urls, start=2)
+        ])
+        
+        for page in pages:
+            all_results.extend(page.get('results', []))
+        
+        elapsed = time.time() - start_time
+        logger.info(f"✓ Fetched {len(all_results)} records over {total_pages} pages in {elapsed:.2f}s")
         return all_results
     
-    def ingest_entity( self, endpoint: str, entity_name: str,  save_to_file: bool = True  ) -> List[Dict[str, Any]]:
+    async def ingest_entity(
+        self,
+        endpoint: str,
+        entity_name: str,
+        save_to_file: bool = True,
+        force_refresh: bool = False
+    ) -> List[Dict[str, Any]]:
         """
         Generic method to ingest data from any API endpoint.
         
+        When a previous run saved the entity together with the ETag of its
+        first page, page 1 is requested conditionally (If-None-Match). On
+        304 Not Modified the saved file is reused (and recorded in
+        ``cached_files``) and no other page is fetched. This also applies
+        when save_to_file is False, as long as an earlier dump is on disk.
+        Page 1 carries ``info.count``, so added records change its ETag.
+        
         Args:
             endpoint: API endpoint URL
             entity_name: Name of the entity (e.g., 'characters', 'episodes')
-            save_to_file: Whether to save raw JSON to file
+            save_to_file: Whether to save raw JSON to file (and its ETag)
+            force_refresh: Ignore the cached file and ETag, always refetch
         
         Returns:
             List of all records from the endpoint
         """
-        logger.info("=" * 60)
-        logger.info(f"Starting {entity_name} ingestion...")
-        logger.info("=" * 60)
+        logger.info(format_banner(f"Starting {entity_name} ingestion..."))
         
         start_time = time.time()
         
+        entity_dir = RAW_DATA_PATH / entity_name
+        etag_path = entity_dir / f"{entity_name}.etag"
+        
         try:
-            records = self.fetch_all_pages(endpoint)
+            # Conditional request only makes sense when the cached data is on disk
+            cached_file = None
+            if not force_refresh and etag_path.exists():
+                cached_file = find_latest_file(entity_dir, f"{entity_name}_*.json*")
+            etag = etag_path.read_text().strip() if cached_file else None
+            
+            first_page, new_etag = await self._request(endpoint, etag=etag)
+            
+            if first_page is None:
+                records = load_json_from_file(cached_file).get('data', [])
+                logger.info(f"✓ {entity_name.title()} unchanged since last ingestion (ETag match)")
+                logger.info(f"  Reusing cached file: {cached_file}")
+                self.cached_files[entity_name] = cached_file
+                
+                print_summary(f"{entity_name.title()} Ingestion Summary", {
+                    f"Total {entity_name.title()}": len(records),
+                    "Elapsed Time": f"{time.time() - start_time:.2f}s",
+                    "Status": "✓ UNCHANGED (cached)"
+                })
+                return records
+            
+            records = await self.fetch_all_pages(endpoint, first_page=first_page)
             
             elapsed_time = time.time() - start_time
             
             # Save to file if requested
             if save_to_file:
                 # Clean up old files before saving new one
-                entity_dir = RAW_DATA_PATH / entity_name
-                cleanup_old_files(entity_dir, f"{entity_name}_*.json", keep_latest=0)
-                
-                timestamp = get_timestamp().replace(':', '-')
-                file_path = entity_dir / f"{entity_name}_{timestamp}.json"
-                
-                data_to_save = {
-                    "ingested_at": get_timestamp(),
-                    "source": endpoint,
-                    "total_records": len(records),
-                    "data": records
-                }
+                cleanup_old_files(entity_dir, f"{entity_name}_*.json*", keep_latest=0)
                 
-                save_json_to_file(data_to_save, file_path)
+                file_path = entity_dir / raw_file_name(entity_name)
+                save_json_to_file(build_raw_document(endpoint, records), file_path)
                 logger.info(f"✓ Saved raw {entity_name} data to: {file_path}")
                 logger.info(f"  (Old files cleaned up, keeping only latest)")
+                
+                # Remember the ETag for conditional requests on the next run
+                if new_etag:
+                    etag_path.write_text(new_etag)
+                elif etag_path.exists():
+                    etag_path.unlink()
             
             # Print summary
             print_summary(f"{entity_name.title()} Ingestion Summary", {
@@ -221,46 +443,84 @@ class RickMortyAPIClient:
             logger.error(f"{entity_name.title()} ingestion failed: {e}")
             raise APIIngestionError(f"Failed to ingest {entity_name}: {e}")
     
-    def close(self):
-        """Close the HTTP session."""
-        self.session.close()
+    async def close(self):
+        """No-op: the shared HTTP client is closed once by close_http_client()."""
+        pass
 
 
-def run_ingestion() -> Dict[str, List[Dict[str, Any]]]:
+async def run_ingestion_async(force_refresh: bool = False, in_memory: bool = False) -> Dict[str, Any]:
     """
-    Run complete ingestion for both characters and episodes.
+    Run complete ingestion for both characters and episodes concurrently.
+    
+    Args:
+        force_refresh: Refetch everything even if the API data is unchanged
+        in_memory: Skip writing files; return the serialized RAW documents
+                   under 'payloads' for a direct upload to the Snowflake stage
     
     Returns:
-        Dictionary with 'characters' and 'episodes' keys containing the data
+        Dictionary with 'characters' and 'episodes' keys containing the data,
+        plus 'payloads' ({entity: (file_name, zstd_json_bytes)}) when in_memory
     """
-    logger.info("\n Starting Rick and Morty API Ingestion Pipeline")
-    logger.info("=" * 60)
+    logger.info("\n Starting Rick and Morty API Ingestion Pipeline\n" + "=" * 60)
     
     client = RickMortyAPIClient()
     
     try:
-        # Ingest characters
-        characters = client.ingest_entity(CHARACTERS_ENDPOINT, "characters", save_to_file=True)
-        
-        # Ingest episodes
-        episodes = client.ingest_entity(EPISODES_ENDPOINT, "episodes", save_to_file=True)
+        # Ingest characters and episodes concurrently
+        characters, episodes = await asyncio.gather(
+            client.ingest_entity(CHARACTERS_ENDPOINT, "characters", save_to_file=not in_memory, force_refresh=force_refresh),
+            client.ingest_entity(EPISODES_ENDPOINT, "episodes", save_to_file=not in_memory, force_refresh=force_refresh)
+        )
         
         # Overall summary
         print_summary("Overall Ingestion Summary", {
             "Total Characters": len(characters),
             "Total Episodes": len(episodes),
             "Total API Records": len(characters) + len(episodes),
-            "Storage Location": str(RAW_DATA_PATH),
+            "API Retries": client.retry_count,
+            "Storage Location": "in memory (streamed to stage)" if in_memory else str(RAW_DATA_PATH),
             "Status": "✓ PIPELINE COMPLETED SUCCESSFULLY"
         })
         
-        return {
+        results = {
             "characters": characters,
             "episodes": episodes
         }
+        
+        if in_memory:
+            results["payloads"] = {
+                entity_name: (
+                    _cached_payload(client.cached_files[entity_name])
+                    if entity_name in client.cached_files else
+                    (raw_file_name(entity_name), zstd_compress(serialize_json(build_raw_document(endpoint, records))))
+                )
+                for entity_name, endpoint, records in [
+                    ("characters", CHARACTERS_ENDPOINT, characters),
+                    ("episodes", EPISODES_ENDPOINT, episodes),
+                ]
+            }
+        
+        return results
     
     finally:
-        client.close()
+        await client.close()
+        await close_http_client()
+
+
+def run_ingestion(force_refresh: bool = False, in_memory: bool = False) -> Dict[str, Any]:
+    """
+    Run complete ingestion for both characters and episodes.
+    Synchronous entry point wrapping run_ingestion_async().
+    
+    Args:
+        force_refresh: Refetch everything even if the API data is unchanged
+        in_memory: Skip writing files and return serialized payloads instead
+    
+    Returns:
+        Dictionary with 'characters' and 'episodes' keys containing the data
+        (and 'payloads' when in_memory)
+    """
+    return asyncio.run(run_ingestion_async(force_refresh=force_refresh, in_memory=in_memory))
 
 
 if __name__ == "__main__":
@@ -268,6 +528,8 @@ if __name__ == "__main__":
     Run ingestion as standalone script for testing.
     Note: Directories will be auto-created when saving files.
     """
+    setup_logging(LOG_LEVEL)
+    
     # Run ingestion
     try:
         result = run_ingestion()
@@ -3,12 +3,24 @@ Data Quality Checks Module
 Executes validation queries and reports results.
 """
 
-from typing import Dict, List, Tuple
+import logging
+from itertools import chain
+from operator import itemgetter
+from typing import Dict
+
+import pandas as pd
+
 from src.snowflake_dal import SnowflakeDAL
-from src.utils import setup_logging, get_timestamp
+from src.utils import setup_logging, get_timestamp, format_banner
 from src.config import LOG_LEVEL
 
-logger = setup_logging(LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+# Normalized check result columns: first SQL column, middle columns, last SQL column
+CHECK_COLUMNS = ['name', 'detail', 'status']
+
+_get_check_name = itemgetter(0)
+_get_check_status = itemgetter(-1)  # Last column is always status
 
 
 def run_quality_checks(dal: SnowflakeDAL) -> Dict[str, any]:
@@ -21,10 +33,7 @@ def run_quality_checks(dal: SnowflakeDAL) -> Dict[str, any]:
     Returns:
         Dictionary with check results
     """
-    logger.info("=" * 60)
-    logger.info("Running Data Quality Checks...")
-    logger.info("=" * 60)
-    logger.info("")
+    logger.info(format_banner("Running Data Quality Checks...") + "\n")
     
     # Execute all checks from SQL file
     checks = execute_all_checks(dal)
@@ -38,7 +47,7 @@ def run_quality_checks(dal: SnowflakeDAL) -> Dict[str, any]:
     return results
 
 
-def execute_all_checks(dal: SnowflakeDAL) -> List[Tuple]:
+def execute_all_checks(dal: SnowflakeDAL) -> pd.DataFrame:
     """
     Execute all quality check queries from SQL file.
     
@@ -46,53 +55,46 @@ def execute_all_checks(dal: SnowflakeDAL) -> List[Tuple]:
         dal: SnowflakeDAL instance
     
     Returns:
-        List of check results (flattened from all queries)
+        DataFrame with one row per check (name, detail, status),
+        flattened from all queries
     """
     logger.info("Executing quality check queries...")
     
     # Use DAL method to execute all SELECT queries from file
     results_by_query = dal.execute_queries_from_file("sql/05_data_quality_checks.sql")
     
-    # Flatten results from all queries into single list
-    all_results = []
-    for result_set in results_by_query:
-        all_results.extend(result_set)
+    # Normalize rows column-wise (check name first, status last, details in between)
+    rows = list(chain.from_iterable(results_by_query))
     
     logger.info("")
-    return all_results
+    return pd.DataFrame({
+        'name': list(map(_get_check_name, rows)),
+        'detail': [tuple(row[1:-1]) for row in rows],
+        'status': list(map(_get_check_status, rows)),
+    }, columns=CHECK_COLUMNS)
 
 
-def analyze_results(checks: List[Tuple]) -> Dict[str, any]:
+def analyze_results(checks: pd.DataFrame) -> Dict[str, any]:
     """
     Analyze check results and categorize by status.
     
     Args:
-        checks: List of check result tuples
+        checks: DataFrame of check results (see execute_all_checks)
     
     Returns:
-        Dictionary with analysis
+        Dictionary with analysis ('passed', 'failed' and 'warnings' are DataFrames)
     """
-    passed = []
-    failed = []
-    warnings = []
+    by_status = dict(tuple(checks.groupby('status', sort=False)))
+    empty = checks.iloc[0:0]
     
-    for check in checks:
-        check_name = check[0]
-        status = check[-1]  # Last column is always status
-        
-        if status == 'PASS':
-            passed.append(check)
-        elif status == 'FAIL':
-            failed.append(check)
-        elif status == 'WARNING':
-            warnings.append(check)
+    passed = by_status.get('PASS', empty)
     
     return {
         'total': len(checks),
         'passed': passed,
-        'failed': failed,
-        'warnings': warnings,
-        'success_rate': (len(passed) / len(checks) * 100) if checks else 0
+        'failed': by_status.get('FAIL', empty),
+        'warnings': by_status.get('WARNING', empty),
+        'success_rate': (len(passed) / len(checks) * 100) if len(checks) else 0
     }
 
 
@@ -103,55 +105,43 @@ def print_quality_summary(results: Dict[str, any]) -> None:
     Args:
         results: Analysis results dictionary
     """
-    logger.info("=" * 60)
-    logger.info("DATA QUALITY SUMMARY")
-    logger.info("=" * 60)
-    logger.info(f"Total Checks: {results['total']}")
-    logger.info(f"Passed: {len(results['passed'])} ✓")
-    logger.info(f"Failed: {len(results['failed'])} ✗")
-    logger.info(f"Warnings: {len(results['warnings'])} ⚠")
-    logger.info(f"Success Rate: {results['success_rate']:.1f}%")
-    logger.info("")
+    logger.info(
+        format_banner("DATA QUALITY SUMMARY")
+        + f"\nTotal Checks: {results['total']}"
+        + f"\nPassed: {len(results['passed'])} ✓"
+        + f"\nFailed: {len(results['failed'])} ✗"
+        + f"\nWarnings: {len(results['warnings'])} ⚠"
+        + f"\nSuccess Rate: {results['success_rate']:.1f}%\n"
+    )
     
     # Show passed checks
-    if results['passed']:
+    if len(results['passed']):
         logger.info("✓ PASSED CHECKS:")
-        for check in results['passed']:
-            check_name = check[0]
+        for check_name in results['passed']['name']:
             logger.info(f"  ✓ {check_name}")
         logger.info("")
     
     # Show warnings
-    if results['warnings']:
+    if len(results['warnings']):
         logger.info("⚠ WARNINGS:")
-        for check in results['warnings']:
-            check_name = check[0]
-            details = check[1:-1]  # Middle columns have details
-            logger.warning(f"  ⚠ {check_name}: {details}")
+        for check in results['warnings'].itertuples(index=False):
+            logger.warning(f"  ⚠ {check.name}: {check.detail}")
         logger.info("")
     
     # Show failed checks
-    if results['failed']:
+    if len(results['failed']):
         logger.info("✗ FAILED CHECKS:")
-        for check in results['failed']:
-            check_name = check[0]
-            details = check[1:-1]  # Middle columns have details
-            logger.error(f"  ✗ {check_name}: {details}")
+        for check in results['failed'].itertuples(index=False):
+            logger.error(f"  ✗ {check.name}: {check.detail}")
         logger.info("")
     
     # Overall status
-    if results['failed']:
-        logger.error("=" * 60)
-        logger.error("⚠ DATA QUALITY: FAILED")
-        logger.error("=" * 60)
-    elif results['warnings']:
-        logger.warning("=" * 60)
-        logger.warning("⚠ DATA QUALITY: PASSED WITH WARNINGS")
-        logger.warning("=" * 60)
+    if len(results['failed']):
+        logger.error(format_banner("⚠ DATA QUALITY: FAILED"))
+    elif len(results['warnings']):
+        logger.warning(format_banner("⚠ DATA QUALITY: PASSED WITH WARNINGS"))
     else:
-        logger.info("=" * 60)
-        logger.info("✓ DATA QUALITY: ALL CHECKS PASSED")
-        logger.info("=" * 60)
+        logger.info(format_banner("✓ DATA QUALITY: ALL CHECKS PASSED"))
     
     logger.info("")
 
@@ -162,13 +152,15 @@ if __name__ == "__main__":
     """
     import sys
     
+    setup_logging(LOG_LEVEL)
+    
     dal = None
     try:
         dal = SnowflakeDAL()
         results = run_quality_checks(dal)
         
         # Exit with error code if any checks failed
-        if results['failed']:
+        if len(results['failed']):
             sys.exit(1)
         else:
             sys.exit(0)
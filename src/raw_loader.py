@@ -2,17 +2,20 @@
 Raw data loader - Load JSON files into Snowflake RAW tables.
 """
 
+import io
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
-from glob import glob
+from typing import Dict, List, Optional, Tuple
 
 from .snowflake_dal import SnowflakeDAL
-from .config import RAW_DATA_PATH, RAW_SCHEMA
-from .utils import setup_logging, print_summary
+from .config import (RAW_DATA_PATH, RAW_SCHEMA, SNOWFLAKE_PUT_PARALLEL, SNOWFLAKE_LOAD_WAREHOUSE_SIZE,
+                     LOG_LEVEL)
+from .utils import setup_logging, scan_files, print_summary, format_banner
 
 
-logger = setup_logging()
+logger = logging.getLogger(__name__)
 
 
 def setup_raw_tables(dal: SnowflakeDAL) -> bool:
@@ -25,9 +28,7 @@ def setup_raw_tables(dal: SnowflakeDAL) -> bool:
     Returns:
         True if successful
     """
-    logger.info("=" * 60)
-    logger.info("Setting up RAW tables...")
-    logger.info("=" * 60)
+    logger.info(format_banner("Setting up RAW tables..."))
     
     try:
         dal.execute_file("sql/02_raw_tables.sql")
@@ -43,10 +44,14 @@ def load_raw_entity(
     entity_name: str,
     raw_data_path: Path,
     target_table: str,
-    stage_name: str
+    stage_name: str,
+    payload: Optional[Tuple[str, bytes]] = None,
+    parallel: int = SNOWFLAKE_PUT_PARALLEL
 ) -> int:
     """
-    Load a single entity's JSON file into Snowflake using PUT + COPY INTO.
+    Load a single entity's JSON files into Snowflake using PUT + a flattening INSERT.
+    All pending files on disk are uploaded with one wildcard PUT and loaded
+    with one INSERT ... SELECT (the loaded files are removed from the stage).
     
     Args:
         dal: SnowflakeDAL instance
@@ -54,74 +59,105 @@ def load_raw_entity(
         raw_data_path: Path to the entity's data directory
         target_table: Target table name
         stage_name: Snowflake stage name
+        payload: Optional in-memory (file_name, zstd_json_bytes) from ingestion,
+                 uploaded directly instead of reading the files on disk
+        parallel: PUT upload parallelism
     
     Returns:
         Number of rows loaded
     """
-    # Find the latest JSON file
-    pattern = f"{entity_name}_*.json"
-    files = sorted(
-        glob(str(raw_data_path / pattern)),
-        key=lambda x: Path(x).stat().st_mtime,
-        reverse=True
-    )
-    
-    if not files:
-        raise FileNotFoundError(f"No {entity_name} files found in {raw_data_path}")
-    
-    latest_file = files[0]
-    logger.info(f"Loading {Path(latest_file).name}")
-    
-    # Upload file to stage
-    dal.upload_file_to_stage(latest_file, stage_name)
+    if payload is not None:
+        file_name, content = payload
+        logger.info(f"Loading {file_name} (in memory)")
+        
+        # Upload the in-memory document to stage
+        dal.upload_file_to_stage(file_name, stage_name, file_stream=io.BytesIO(content), parallel=parallel)
+        
+        # Only this document (PUT may have added '.gz'); '[.]' avoids backslash
+        # escapes inside the SQL string literal. '[^/]*' keeps the match in
+        # the stage root, away from staged chunk folders
+        stage_pattern = ".*" + file_name.replace(".", "[.]") + "[^/]*"
+    else:
+        # Find all pending JSON files
+        pattern = f"{entity_name}_*.json*"  # .json.zst (also picks up plain .json)
+        # Single directory pass (empty if the directory doesn't exist yet)
+        files = scan_files(raw_data_path, pattern)
+        
+        if not files:
+            raise FileNotFoundError(f"No {entity_name} files found in {raw_data_path}")
+        
+        logger.info(f"Loading {len(files)} {entity_name} file(s)")
+        
+        # Upload every matching file with a single wildcard PUT
+        dal.upload_file_to_stage(str(raw_data_path / pattern), stage_name, parallel=parallel)
+        
+        # File names only: chunk folders (_chunks/<file>/…) must not match
+        stage_pattern = f".*{entity_name}_[^/]*[.]json[^/]*"
     
-    # Flatten JSON array and load into table
-    rows_loaded = dal.copy_into_from_stage(
+    # Flatten JSON arrays of all matching staged files and load into table
+    rows_loaded = dal.insert_flattened_from_stage(
         table_name=target_table,
         stage_name=stage_name,
-        file_pattern=Path(latest_file).name,
-        flatten_json_array=True
+        pattern=stage_pattern,
+        file_format=f"{RAW_SCHEMA}.json_format"
     )
     
     logger.info(f"✓ Loaded {rows_loaded} rows into {target_table}")
     return rows_loaded
 
 
-def load_raw_data(dal: SnowflakeDAL) -> Dict[str, int]:
+def load_raw_data(dal: SnowflakeDAL, payloads: Optional[Dict[str, Tuple[str, bytes]]] = None) -> Dict[str, int]:
     """
     Load JSON files into RAW tables.
+    Characters and episodes load concurrently, each on its own connection
+    (the second one borrowed from the DAL pool, which is sized for it by
+    default); if the pool has no idle connection, they load one after
+    another instead of waiting for one.
     
     Args:
         dal: SnowflakeDAL instance
+        payloads: Optional in-memory documents per entity (see run_ingestion(in_memory=True));
+                  entities without a payload are loaded from disk
     
     Returns:
         Dictionary with row counts for each table
     """
-    logger.info("=" * 60)
-    logger.info("Loading data into RAW tables...")
-    logger.info("=" * 60)
-    logger.info("")
+    logger.info(format_banner("Loading data into RAW tables...") + "\n")
     
-    # Load characters
-    logger.info("Loading characters...")
-    characters_count = load_raw_entity(
-        dal,
-        entity_name="characters",
-        raw_data_path=RAW_DATA_PATH / "characters",
-        target_table=f"{RAW_SCHEMA}.characters",
-        stage_name="@raw_data_stage"
-    )
-    logger.info("")
+    payloads = payloads or {}
     
-    # Load episodes
-    logger.info("Loading episodes...")
-    episodes_count = load_raw_entity(
-        dal,
-        entity_name="episodes",
-        raw_data_path=RAW_DATA_PATH / "episodes",
-        target_table=f"{RAW_SCHEMA}.episodes",
-        stage_name="@raw_data_stage"
-    )
+    def load(entity_name: str) -> int:
+        return load_raw_entity(
+            dal,
+            entity_name=entity_name,
+            raw_data_path=RAW_DATA_PATH / entity_name,
+            target_table=f"{RAW_SCHEMA}.{entity_name}",
+            stage_name=f"@{RAW_SCHEMA}.raw_data_stage",
+            payload=payloads.get(entity_name)
+        )
+    
+    def load_on_borrowed_connection(entity_name: str) -> Optional[int]:
+        # Worker threads get their own pooled connection (separate session).
+        # Never wait for one: the caller may already hold a pooled connection
+        with dal.borrow(block=False) as connection:
+            if connection is None:
+                return None
+            return load(entity_name)
+    
+    # Load episodes in a worker while characters load on the caller's connection
+    logger.info("Loading characters and episodes concurrently...")
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="raw-load") as executor:
+        episodes_future = executor.submit(load_on_borrowed_connection, "episodes")
+        characters_count = load("characters")
+        episodes_count = episodes_future.result()
+    
+    if episodes_count is None:
+        # No spare pooled connection: load episodes after characters instead
+        logger.warning(
+            "⚠ No spare Snowflake connection, loading episodes after characters "
+            "(raise SNOWFLAKE_POOL_SIZE to load them concurrently)"
+        )
+        episodes_count = load("episodes")
     logger.info("")
     
     return {
@@ -130,32 +166,27 @@ def load_raw_data(dal: SnowflakeDAL) -> Dict[str, int]:
     }
 
 
-def verify_raw_data(dal: SnowflakeDAL) -> Dict[str, int]:
+def verify_raw_data(dal: SnowflakeDAL, load_results: Optional[Dict[str, int]] = None) -> Dict[str, int]:
     """
     Verify data was loaded correctly.
     
     Args:
         dal: SnowflakeDAL instance
+        load_results: Row counts returned by load_raw_data(); when given the
+                      tables are not re-counted, and each sample is checked to
+                      be non-empty exactly when its reported count is
     
     Returns:
-        Dictionary with verification results
+        Dictionary with verification results ('counted' tells whether the
+        counts come from COUNT(*) or from the load)
+    
+    Raises:
+        ValueError: If a table sample contradicts the reported load count
     """
-    logger.info("=" * 60)
-    logger.info("Verifying RAW data...")
-    logger.info("=" * 60)
+    logger.info(format_banner("Verifying RAW data..."))
     
     try:
-        # Check row counts
-        char_count = dal.get_row_count("characters", RAW_SCHEMA)
-        ep_count = dal.get_row_count("episodes", RAW_SCHEMA)
-        
-        logger.info(f"  Characters in characters: {char_count}")
-        logger.info(f"  Episodes in episodes: {ep_count}")
-        logger.info("")
-        
-        # Sample data
-        logger.info("Sample character data:")
-        char_sample = dal.execute_query(
+        queries = [
             f"""
             SELECT 
                 id,
@@ -165,15 +196,6 @@ def verify_raw_data(dal: SnowflakeDAL) -> Dict[str, int]:
             FROM {RAW_SCHEMA}.characters 
             LIMIT 5
             """,
-            fetch=True
-        )
-        
-        for row in char_sample:
-            logger.info(f"  ID: {row[0]}, Name: {row[1]}, Species: {row[2]}, Status: {row[3]}")
-        
-        logger.info("")
-        logger.info("Sample episode data:")
-        ep_sample = dal.execute_query(
             f"""
             SELECT 
                 id,
@@ -183,9 +205,41 @@ def verify_raw_data(dal: SnowflakeDAL) -> Dict[str, int]:
             FROM {RAW_SCHEMA}.episodes 
             LIMIT 5
             """,
-            fetch=True
-        )
+        ]
+        if load_results is None:
+            # Counts in one query, run concurrently with the samples
+            queries.append(f"""
+            SELECT 
+                (SELECT COUNT(*) FROM {RAW_SCHEMA}.characters),
+                (SELECT COUNT(*) FROM {RAW_SCHEMA}.episodes)
+            """)
+        
+        results = dal.execute_queries_async(queries)
+        char_sample, ep_sample = results[0], results[1]
         
+        counted = load_results is None
+        if counted:
+            char_count, ep_count = results[2][0]
+            logger.info(f"  Characters in characters: {char_count}")
+            logger.info(f"  Episodes in episodes: {ep_count}")
+        else:
+            # RAW tables are recreated on every run, so the rows reported by
+            # the load are the table counts; no COUNT(*) round trip needed.
+            # The samples still have to agree with them
+            char_count, ep_count = load_results['characters'], load_results['episodes']
+            for table, sample, count in (("characters", char_sample, char_count), ("episodes", ep_sample, ep_count)):
+                if bool(sample) != (count > 0):
+                    raise ValueError(f"{RAW_SCHEMA}.{table} sample has {len(sample)} row(s) but the load reported {count}")
+            logger.info("  ✓ Table samples match the loaded row counts")
+        logger.info("")
+        
+        # Sample data
+        logger.info("Sample character data:")
+        for row in char_sample:
+            logger.info(f"  ID: {row[0]}, Name: {row[1]}, Species: {row[2]}, Status: {row[3]}")
+        
+        logger.info("")
+        logger.info("Sample episode data:")
         for row in ep_sample:
             logger.info(f"  ID: {row[0]}, Name: {row[1]}, Episode: {row[2]}, Air Date: {row[3]}")
         
@@ -194,7 +248,8 @@ def verify_raw_data(dal: SnowflakeDAL) -> Dict[str, int]:
         
         return {
             "characters_count": char_count,
-            "episodes_count": ep_count
+            "episodes_count": ep_count,
+            "counted": counted
         }
     
     except Exception as e:
@@ -202,36 +257,117 @@ def verify_raw_data(dal: SnowflakeDAL) -> Dict[str, int]:
         raise
 
 
-def run_raw_data_pipeline(dal: SnowflakeDAL):
+def _session_warehouse(dal: SnowflakeDAL) -> str:
+    """
+    Get the configured warehouse name, validated for use in SQL.
+    
+    Args:
+        dal: SnowflakeDAL instance
+    
+    Returns:
+        Warehouse name
+    """
+    warehouse = dal.config.get("warehouse")
+    if not re.fullmatch(r"[A-Za-z0-9_$]+", warehouse or ""):
+        raise ValueError(f"Invalid warehouse name: {warehouse!r}")
+    return warehouse
+
+
+def get_warehouse_size(dal: SnowflakeDAL) -> str:
+    """
+    Read the current size of the session's warehouse (SHOW WAREHOUSES).
+    
+    Args:
+        dal: SnowflakeDAL instance
+    
+    Returns:
+        Warehouse size as reported by Snowflake (e.g. 'X-Small')
+    """
+    warehouse = _session_warehouse(dal)
+    
+    with dal.get_cursor() as cursor:
+        cursor.execute(f"SHOW WAREHOUSES LIKE '{warehouse}'")
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Warehouse {warehouse} not found")
+        
+        columns = [column[0].lower() for column in cursor.description]
+        return row[columns.index("size")]
+
+
+def resize_warehouse(dal: SnowflakeDAL, size: str, wait: bool = False) -> None:
+    """
+    Resize the session's warehouse.
+    
+    Args:
+        dal: SnowflakeDAL instance
+        size: Warehouse size (e.g. 'X-SMALL', 'MEDIUM')
+        wait: Block until the new size is provisioned
+    """
+    warehouse = _session_warehouse(dal)
+    if not re.fullmatch(r"[A-Za-z0-9-]+", size):
+        raise ValueError(f"Invalid warehouse size: {size!r}")
+    
+    logger.info(f"Resizing warehouse {warehouse} to {size}")
+    dal.execute_query(
+        f"ALTER WAREHOUSE {warehouse} SET WAREHOUSE_SIZE = '{size}'"
+        + (" WAIT_FOR_COMPLETION = TRUE" if wait else "")
+    )
+
+
+def run_raw_data_pipeline(dal: SnowflakeDAL, payloads: Optional[Dict[str, Tuple[str, bytes]]] = None):
     """
     Complete pipeline: Setup tables and load raw data.
     
     Args:
         dal: SnowflakeDAL instance
+        payloads: Optional in-memory documents per entity, uploaded instead of files
     
     Returns:
         Dictionary with pipeline results
     """
-    logger.info("\n🚀 Starting RAW Data Pipeline")
-    logger.info("=" * 60)
+    logger.info("\n🚀 Starting RAW Data Pipeline\n" + "=" * 60)
     
     # Step 1: Setup tables
     setup_raw_tables(dal)
     
-    # Step 2: Load data
-    load_results = load_raw_data(dal)
+    # Optionally scale the warehouse up for the load window: larger
+    # warehouses spread COPY file scans across more servers. The size it
+    # had before is restored afterwards
+    original_size = None
+    if SNOWFLAKE_LOAD_WAREHOUSE_SIZE:
+        current_size = get_warehouse_size(dal)
+        if current_size.replace("-", "").upper() != SNOWFLAKE_LOAD_WAREHOUSE_SIZE.replace("-", "").upper():
+            resize_warehouse(dal, SNOWFLAKE_LOAD_WAREHOUSE_SIZE, wait=True)
+            original_size = current_size
     
-    # Step 3: Verify
-    verify_results = verify_raw_data(dal)
+    try:
+        # Step 2: Load data
+        load_results = load_raw_data(dal, payloads)
+        
+        # Step 3: Verify
+        verify_results = verify_raw_data(dal, load_results)
     
-    # Summary
-    print_summary("RAW Data Pipeline Summary", {
+    finally:
+        if original_size:
+            try:
+                resize_warehouse(dal, original_size)
+            except Exception as e:
+                # Don't mask the load's own exception
+                logger.error(f"✗ Failed to restore warehouse size to {original_size}: {e}")
+    
+    # Summary (table counts only when verification actually counted them)
+    summary = {
         "Characters Loaded": load_results['characters'],
         "Episodes Loaded": load_results['episodes'],
-        "Characters in Table": verify_results['characters_count'],
-        "Episodes in Table": verify_results['episodes_count'],
-        "Status": "✓ SUCCESS"
-    })
+    }
+    if verify_results['counted']:
+        summary["Characters in Table"] = verify_results['characters_count']
+        summary["Episodes in Table"] = verify_results['episodes_count']
+    else:
+        summary["Verification"] = "samples match loaded counts"
+    summary["Status"] = "✓ SUCCESS"
+    print_summary("RAW Data Pipeline Summary", summary)
     
     return {
         "loaded": load_results,
@@ -245,6 +381,8 @@ if __name__ == "__main__":
     """
     import sys
     
+    setup_logging(LOG_LEVEL)
+    
     dal = None
     try:
         dal = SnowflakeDAL()
@@ -3,75 +3,296 @@ Snowflake Data Access Layer (DAL).
 Handles database connections, DDL execution, and data operations.
 """
 
+import functools
+import io
 import logging
-from typing import Optional, List, Dict, Any
+import os
+import queue
+import tempfile
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Iterator, Tuple, BinaryIO, TextIO
 
+import orjson
 import snowflake.connector
 from snowflake.connector import SnowflakeConnection
+from snowflake.connector.cursor import SnowflakeCursor
 from snowflake.connector.errors import Error as SnowflakeError
+from snowflake.connector.util_text import split_statements
 
-from .config import SNOWFLAKE_CONFIG
-from .utils import setup_logging
+if TYPE_CHECKING:
+    import pyarrow as pa
 
+from .config import SNOWFLAKE_CONFIG, SNOWFLAKE_POOL_SIZE, SNOWFLAKE_PUT_PARALLEL, LOG_LEVEL
+from .utils import setup_logging, iter_json_items, zstd_compress, format_banner
 
-logger = setup_logging()
+
+logger = logging.getLogger(__name__)
+
+
+# Below this many records, plain INSERTs beat the fixed PUT + COPY overhead
+SMALL_LOAD_ROW_THRESHOLD = 100
+
+# Larger loads are split into NDJSON chunks of this many records, written
+# and PUT by this many worker threads while the source file is still parsed
+LOAD_CHUNK_ROWS = 50_000
+LOAD_CHUNK_WORKERS = 4
+# Stage folder for chunk uploads, kept apart from the whole-file loads
+LOAD_CHUNK_FOLDER = "_chunks"
+
+# DDL that can run concurrently with its neighbours: CREATE TABLE without
+# foreign keys (REFERENCES) to other tables
+_INDEPENDENT_DDL = re.compile(r'^CREATE\s+(OR\s+REPLACE\s+)?TABLE\b', re.IGNORECASE)
+
+
+def _is_independent_statement(statement: str) -> bool:
+    """
+    Check whether a statement can be submitted as an async query alongside others.
+    
+    Args:
+        statement: SQL statement
+    
+    Returns:
+        True for CREATE TABLE statements that do not reference other tables
+    """
+    return bool(_INDEPENDENT_DDL.match(statement)) and 'REFERENCES' not in statement.upper()
+
+
+# Identifiers interpolated into load SQL: [@]name[.name...], optional path suffix
+_IDENTIFIER = re.compile(r'^@?[A-Za-z_][A-Za-z0-9_$]*(\.[A-Za-z_][A-Za-z0-9_$]*)*$')
+_STAGE_PATH = re.compile(r'^[A-Za-z0-9_.$/=-]*$')
+
+
+def _validate_load_sql_parts(
+    table_name: str,
+    stage_name: str,
+    file_pattern: Optional[str] = None,
+    pattern: Optional[str] = None,
+    file_format: Optional[str] = None
+) -> None:
+    """
+    Check the identifiers and literals interpolated into COPY/INSERT load SQL.
+    Keeps the statement text constant per table (no per-file literals) and
+    rejects anything that could break out of it.
+    
+    Args:
+        table_name: Target table name
+        stage_name: Stage name (with @ prefix)
+        file_pattern: Optional path prefix within the stage
+        pattern: Optional file-name regex (single-quoted literal)
+        file_format: Optional named file format
+    
+    Raises:
+        ValueError: If a value is not a plain identifier / safe literal
+    """
+    for label, value in (("table", table_name), ("stage", stage_name), ("file format", file_format)):
+        if value is not None and not _IDENTIFIER.match(value):
+            raise ValueError(f"Invalid {label} name: {value!r}")
+    
+    if file_pattern is not None and not _STAGE_PATH.match(file_pattern):
+        raise ValueError(f"Invalid stage path: {file_pattern!r}")
+    
+    if pattern is not None and ("'" in pattern or "\\" in pattern):
+        raise ValueError(f"Invalid file pattern (quotes/backslashes not allowed): {pattern!r}")
+
+
+def _wait_for_query(conn: SnowflakeConnection, query_id: str, poll_interval: float = 0.1) -> None:
+    """
+    Block until an async query finishes.
+    
+    Args:
+        conn: Connection the query was submitted on
+        query_id: Query ID (cursor.sfqid after execute_async)
+        poll_interval: Seconds between status polls
+    
+    Raises:
+        SnowflakeError: If the query failed
+    """
+    while conn.is_still_running(conn.get_query_status(query_id)):
+        time.sleep(poll_interval)
+    conn.get_query_status_throw_if_error(query_id)
+
+
+def _load_private_key(key_path: str, passphrase: Optional[str] = None) -> bytes:
+    """
+    Load a PEM private key and convert it to the DER bytes expected by the connector.
+    
+    Args:
+        key_path: Path to the PEM encoded (PKCS#8) private key
+        passphrase: Optional key passphrase
+    
+    Returns:
+        DER encoded private key
+    """
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives import serialization
+    
+    with open(key_path, 'rb') as f:
+        private_key = serialization.load_pem_private_key(
+            f.read(),
+            password=passphrase.encode() if passphrase else None,
+            backend=default_backend()
+        )
+    
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+
+def _split_statements(buf: TextIO) -> List[str]:
+    """
+    Split SQL read from a text stream with the connector's statement splitter.
+    Semicolons inside strings or $$ blocks don't split; comments are removed.
+    
+    Args:
+        buf: Text stream (StringIO or open file), read line by line
+    
+    Returns:
+        Non-empty statements without trailing semicolons
+    """
+    statements = []
+    for stmt, _is_put_or_get in split_statements(buf, remove_comments=True):
+        cleaned_stmt = stmt.strip().rstrip(';').rstrip()
+        
+        # Only add non-empty statements
+        if cleaned_stmt:
+            statements.append(cleaned_stmt)
+    
+    return statements
+
+
+def split_sql_statements(sql_script: str) -> List[str]:
+    """
+    Split a SQL script into individual statements.
+    
+    Args:
+        sql_script: SQL script with multiple statements
+    
+    Returns:
+        Non-empty statements, comments and trailing semicolons removed
+    """
+    return _split_statements(io.StringIO(sql_script))
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_sql_file(sql_file_path: str, mtime: float) -> Tuple[str, ...]:
+    """
+    Read and split a SQL file, cached per (path, modification time).
+    The file is streamed into the splitter rather than read whole.
+    
+    Args:
+        sql_file_path: Path to SQL file
+        mtime: File modification time (cache key, invalidates edited files)
+    
+    Returns:
+        Tuple of statements
+    """
+    with open(sql_file_path, 'r') as f:
+        return tuple(_split_statements(f))
 
 
 class SnowflakeDAL:
     """
     Data Access Layer for Snowflake operations.
     Handles connections and SQL execution.
+    
+    Besides the default connection, keeps a small pool of connections that
+    threads can borrow() so concurrent pipeline steps get their own session.
     """
     
-    def __init__(self, config: Optional[Dict[str, str]] = None):
+    def __init__(self, config: Optional[Dict[str, str]] = None, pool_size: int = SNOWFLAKE_POOL_SIZE):
         """
         Initialize Snowflake DAL.
         
         Args:
             config: Snowflake connection configuration.
                     If None, uses SNOWFLAKE_CONFIG from environment.
+            pool_size: Maximum number of connections handed out by borrow()
+                       (with 1, concurrent pipeline steps run one at a time)
+        
+        Raises:
+            ValueError: If configuration is missing or pool_size is below 1
         """
+        if pool_size < 1:
+            raise ValueError(
+                f"Snowflake pool size must be at least 1 (got {pool_size}); "
+                f"check SNOWFLAKE_POOL_SIZE in your .env file."
+            )
+        
         self.config = config or SNOWFLAKE_CONFIG
+        self.pool_size = pool_size
         self._connection: Optional[SnowflakeConnection] = None
         self._validate_config()
+        
+        # Connection pool (connections are opened lazily on first borrow).
+        # A None entry is a free slot handed to the next borrower, so a
+        # waiter is woken when a connection is dropped instead of returned
+        self._pool: "queue.Queue[Optional[SnowflakeConnection]]" = queue.Queue()
+        self._pool_connections: List[SnowflakeConnection] = []
+        self._pool_slots = 0  # Slots taken by open, opening or freed (None) connections (<= pool_size)
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
     
     def _validate_config(self):
         """
         Validate that required configuration is present.
+        Either a password or a private key path is required for authentication.
         
         Raises:
             ValueError: If required configuration is missing
         """
-        required_keys = ["account", "user", "password"]
+        required_keys = ["account", "user"]
         missing = [key for key in required_keys if not self.config.get(key)]
         
+        if not self.config.get("password") and not self.config.get("private_key_path"):
+            missing.append("password (or private_key_path)")
+        
         if missing:
             raise ValueError(
                 f"Missing required Snowflake configuration: {', '.join(missing)}\n"
                 f"Please check your .env file."
             )
     
-    def connect(self) -> SnowflakeConnection:
+    def _open_connection(self) -> SnowflakeConnection:
         """
-        Establish connection to Snowflake.
+        Open a new Snowflake connection.
+        Uses key-pair authentication when a private key is configured.
         
         Returns:
-            Active Snowflake connection
+            New Snowflake connection
         
         Raises:
             SnowflakeError: If connection fails
         """
-        if self._connection is not None and not self._connection.is_closed():
-            logger.debug("Using existing Snowflake connection")
-            return self._connection
-        
         try:
             logger.info(f"Connecting to Snowflake account: {self.config['account']}")
             
-            self._connection = snowflake.connector.connect(
+            if self.config.get("private_key_path"):
+                credentials = {
+                    "private_key": _load_private_key(
+                        self.config["private_key_path"],
+                        self.config.get("private_key_passphrase")
+                    )
+                }
+            else:
+                credentials = {"password": self.config["password"]}
+            
+            # Reuse OCSP responses across runs instead of re-validating each time
+            ocsp_options = {}
+            if self.config.get("ocsp_cache_file"):
+                ocsp_options["ocsp_response_cache_filename"] = self.config["ocsp_cache_file"]
+            
+            connection = snowflake.connector.connect(
                 account=self.config["account"],
                 user=self.config["user"],
-                password=self.config["password"],
+                **credentials,
                 role=self.config.get("role"),
                 warehouse=self.config.get("warehouse"),
                 database=self.config.get("database"),
@@ -79,37 +300,193 @@ class SnowflakeDAL:
                 session_parameters={
                     'QUERY_TAG': 'rick_morty_pipeline',
                 },
-                # SSL configuration to handle certificate issues
-                ocsp_fail_open=True,  # Allow connection even if certificate validation fails
-                insecure_mode=True,   # Completely bypass SSL certificate validation
+                client_session_keep_alive=True,  # Keep pooled sessions from expiring between steps
+                client_prefetch_threads=4,
+                ocsp_fail_open=True,  # Don't fail the connection when the OCSP responder is unreachable
+                **ocsp_options,
             )
             
             logger.info("✓ Successfully connected to Snowflake")
             
-            # Log connection details
-            cursor = self._connection.cursor()
-            cursor.execute("SELECT CURRENT_ACCOUNT(), CURRENT_USER(), CURRENT_ROLE(), CURRENT_WAREHOUSE()")
-            account, user, role, warehouse = cursor.fetchone()
-            logger.info(f"  Account: {account}")
-            logger.info(f"  User: {user}")
-            logger.info(f"  Role: {role}")
-            logger.info(f"  Warehouse: {warehouse}")
-            cursor.close()
+            # Log connection details; the session's effective values need a
+            # server round trip, so only query them when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                cursor = connection.cursor()
+                cursor.execute("SELECT CURRENT_ACCOUNT(), CURRENT_USER(), CURRENT_ROLE(), CURRENT_WAREHOUSE()")
+                account, user, role, warehouse = cursor.fetchone()
+                cursor.close()
+            else:
+                account = self.config["account"]
+                user = self.config["user"]
+                role = self.config.get("role")
+                warehouse = self.config.get("warehouse")
+            logger.info(f"  Account: {account}\n  User: {user}\n  Role: {role}\n  Warehouse: {warehouse}")
             
-            return self._connection
+            return connection
         
         except SnowflakeError as e:
             logger.error(f"Failed to connect to Snowflake: {e}")
             raise
     
+    def connect(self) -> SnowflakeConnection:
+        """
+        Establish connection to Snowflake.
+        
+        Inside a borrow() block, returns the connection borrowed by the
+        current thread; otherwise returns the default connection.
+        
+        Returns:
+            Active Snowflake connection
+        
+        Raises:
+            SnowflakeError: If connection fails
+        """
+        borrowed = getattr(self._local, "connection", None)
+        if borrowed is not None:
+            return borrowed
+        
+        if self._connection is not None and not self._connection.is_closed():
+            logger.debug("Using existing Snowflake connection")
+            return self._connection
+        
+        self._connection = self._open_connection()
+        return self._connection
+    
+    @contextmanager
+    def borrow(self, block: bool = True) -> Iterator[Optional[SnowflakeConnection]]:
+        """
+        Borrow a pooled connection for the current thread.
+        
+        All DAL calls made by this thread inside the block run on the
+        borrowed connection (its own Snowflake session). Blocks while
+        pool_size connections are already in use, unless block is False.
+        
+        Args:
+            block: Wait for a connection when the pool is exhausted. With
+                   False, yields None instead (use this when the caller
+                   already holds a pooled connection, to avoid deadlocks)
+        
+        Yields:
+            Borrowed Snowflake connection, or None if none was available
+        """
+        connection = self._acquire_pooled_connection(block)
+        if connection is None:
+            yield None
+            return
+        
+        self._local.connection = connection
+        
+        try:
+            yield connection
+        finally:
+            self._local.connection = None
+            if not connection.is_closed():
+                self._pool.put(connection)
+            else:
+                # Closed while in use: hand its slot to the next borrower
+                with self._pool_lock:
+                    self._pool_connections.remove(connection)
+                self._pool.put(None)
+    
+    def _acquire_pooled_connection(self, block: bool = True) -> Optional[SnowflakeConnection]:
+        """
+        Take an idle pooled connection, opening a new one while under pool_size.
+        
+        A slot is reserved under the pool lock and the connection is opened
+        outside it, so a slow login doesn't stall other borrowers. Idle
+        connections whose session was dropped are replaced in their slot.
+        
+        Args:
+            block: Wait for a returned connection when the pool is exhausted
+        
+        Returns:
+            Snowflake connection reserved for the caller, or None when the
+            pool is exhausted and block is False
+        """
+        with self._pool_lock:
+            try:
+                # A connection, or None for a slot freed by a dropped one
+                connection = self._pool.get_nowait()
+                reserved = connection is None
+            except queue.Empty:
+                connection = None
+                reserved = self._pool_slots < self.pool_size
+                if reserved:
+                    self._pool_slots += 1
+        
+        if connection is None and not reserved:
+            if not block:
+                return None
+            
+            # Pool exhausted, wait for a connection (or a freed slot)
+            connection = self._pool.get()
+        
+        if connection is not None:
+            if not connection.is_closed():
+                return connection
+            
+            # Dropped session: discard it and reopen in the same slot
+            logger.warning("⚠ Pooled Snowflake connection was closed, reconnecting")
+            with self._pool_lock:
+                self._pool_connections.remove(connection)
+        
+        try:
+            connection = self._open_connection()
+        except Exception:
+            # Give the slot back (waking a waiter, if any)
+            self._pool.put(None)
+            raise
+        
+        with self._pool_lock:
+            self._pool_connections.append(connection)
+        return connection
+    
     def close(self):
-        """Close Snowflake connection."""
+        """Close Snowflake connections (default and pooled)."""
         if self._connection and not self._connection.is_closed():
             self._connection.close()
             logger.info("✓ Snowflake connection closed")
             self._connection = None
+        
+        with self._pool_lock:
+            for connection in self._pool_connections:
+                if not connection.is_closed():
+                    connection.close()
+            if self._pool_connections:
+                logger.info(f"✓ Closed {len(self._pool_connections)} pooled Snowflake connection(s)")
+            self._pool_connections = []
+            self._pool_slots = 0
+            self._pool = queue.Queue()
     
-    def execute_query( self, query: str, params: Optional[tuple] = None, fetch: bool = False ) -> Optional[List]:
+    @contextmanager
+    def get_cursor(self, cursor: Optional[SnowflakeCursor] = None) -> Iterator[SnowflakeCursor]:
+        """
+        Provide a cursor, reusing the given one or opening (and closing) a new one.
+        Lets a sequence of queries share one cursor instead of one per call.
+        
+        Args:
+            cursor: Optional cursor to reuse; left open for the caller
+        
+        Yields:
+            Snowflake cursor
+        """
+        if cursor is not None:
+            yield cursor
+            return
+        
+        cursor = self.connect().cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+    
+    def execute_query(
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+        fetch: bool = False,
+        cursor: Optional[SnowflakeCursor] = None
+    ) -> Optional[List]:
         """
         Execute a single SQL query.
         
@@ -117,61 +494,85 @@ class SnowflakeDAL:
             query: SQL query to execute
             params: Query parameters for safe parameterization
             fetch: If True, returns results
+            cursor: Optional cursor to reuse (see get_cursor()); a new one is
+                    opened and closed otherwise
         
         Returns:
             Query results if fetch=True, None otherwise
         """
-        conn = self.connect()
-        cursor = conn.cursor()
-        
-        try:
-            logger.debug(f"Executing query: {query[:200]}...")
-            
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            if fetch:
-                results = cursor.fetchall()
-                return results
+        with self.get_cursor(cursor) as cur:
+            try:
+                logger.debug(f"Executing query: {query[:200]}...")
+                
+                if params:
+                    cur.execute(query, params)
+                else:
+                    cur.execute(query)
+                
+                if fetch:
+                    results = cur.fetchall()
+                    return results
+                
+                return None
             
-            return None
+            except SnowflakeError as e:
+                logger.error(f"Query execution failed: {e}")
+                logger.error(f"Query: {query}")
+                raise
+    
+    def execute_query_arrow(
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+        cursor: Optional[SnowflakeCursor] = None
+    ) -> Optional["pa.Table"]:
+        """
+        Execute a query and return the result as a pyarrow Table.
+        Reads Snowflake's Arrow result batches directly instead of building
+        Python tuples; prefer this for large results processed downstream.
+        Requires the connector's pandas extra (pyarrow).
         
-        except SnowflakeError as e:
-            logger.error(f"Query execution failed: {e}")
-            logger.error(f"Query: {query}")
-            raise
+        Args:
+            query: SQL query to execute
+            params: Query parameters for safe parameterization
+            cursor: Optional cursor to reuse (see get_cursor())
         
-        finally:
-            cursor.close()
+        Returns:
+            Arrow table with the result, or None if the query returned no rows
+        """
+        with self.get_cursor(cursor) as cur:
+            try:
+                logger.debug(f"Executing query (arrow): {query[:200]}...")
+                
+                if params:
+                    cur.execute(query, params)
+                else:
+                    cur.execute(query)
+                
+                return cur.fetch_arrow_all()
+            
+            except SnowflakeError as e:
+                logger.error(f"Query execution failed: {e}")
+                logger.error(f"Query: {query}")
+                raise
     
     def execute_script(self, sql_script: str) -> None:
         """
         Execute a multi-statement SQL script.
-        Splits by semicolon and executes each statement.
+        Splits into statements and executes each one.
         
         Args:
             sql_script: SQL script with multiple statements
         """
-        # Split by semicolon
-        raw_statements = sql_script.split(';')
-        
-        # Clean each statement: remove comment lines and empty lines
-        statements = []
-        for stmt in raw_statements:
-            # Remove comment lines (lines starting with --)
-            cleaned_lines = [
-                line 
-                for line in stmt.split('\n') 
-                if line.strip() and not line.strip().startswith('--')
-            ]
-            cleaned_stmt = '\n'.join(cleaned_lines).strip()
-            
-            # Only add non-empty statements
-            if cleaned_stmt:
-                statements.append(cleaned_stmt)
+        self._execute_statements(split_sql_statements(sql_script))
+    
+    def _execute_statements(self, statements: List[str]) -> None:
+        """
+        Execute already split SQL statements in order on one cursor.
         
+        Args:
+            statements: SQL statements (without trailing semicolons)
+        """
         logger.info(f"Executing script with {len(statements)} statements...")
         
         conn = self.connect()
@@ -203,10 +604,75 @@ class SnowflakeDAL:
         """
         logger.info(f"Executing SQL file: {sql_file_path}")
         
-        with open(sql_file_path, 'r') as f:
-            sql_script = f.read()
+        statements = _parse_sql_file(sql_file_path, os.stat(sql_file_path).st_mtime)
+        self._execute_statements(list(statements))
+    
+    def execute_file_async(self, sql_file_path: str, poll_interval: float = 0.1) -> List[str]:
+        """
+        Execute SQL statements from a file, running independent DDL concurrently.
+        
+        Consecutive independent statements (CREATE TABLE without REFERENCES)
+        are submitted together with execute_async() and run in parallel on
+        Snowflake; every other statement (USE, DROP, CREATE SCHEMA, tables with
+        foreign keys, ...) runs synchronously in file order once the previous
+        async batch has finished.
         
-        self.execute_script(sql_script)
+        Args:
+            sql_file_path: Path to SQL file
+            poll_interval: Seconds between query status polls
+        
+        Returns:
+            Query IDs of the statements submitted asynchronously
+        """
+        logger.info(f"Executing SQL file (async DDL): {sql_file_path}")
+        
+        statements = _parse_sql_file(sql_file_path, os.stat(sql_file_path).st_mtime)
+        
+        conn = self.connect()
+        cursor = conn.cursor()
+        query_ids: List[str] = []
+        pending: List[Tuple[int, str]] = []
+        
+        def wait_for_pending() -> None:
+            # Wait for the whole batch (total time is the slowest query)
+            for i, qid in pending:
+                try:
+                    _wait_for_query(conn, qid, poll_interval)
+                except SnowflakeError as e:
+                    logger.error(f"✗ Statement {i} (query {qid}) failed: {e}")
+                    raise
+                logger.info(f"✓ Statement {i}/{len(statements)} executed successfully (async)")
+            pending.clear()
+        
+        try:
+            for i, statement in enumerate(statements, 1):
+                logger.debug(f"Statement {i}/{len(statements)}: {statement[:100]}...")
+                
+                if _is_independent_statement(statement):
+                    cursor.execute_async(statement)
+                    pending.append((i, cursor.sfqid))
+                    query_ids.append(cursor.sfqid)
+                    continue
+                
+                wait_for_pending()
+                try:
+                    cursor.execute(statement)
+                    logger.info(f"✓ Statement {i}/{len(statements)} executed successfully")
+                except SnowflakeError as e:
+                    logger.error(f"✗ Statement {i} failed: {e}")
+                    logger.error(f"Statement: {statement}")
+                    raise
+            
+            wait_for_pending()
+        
+        finally:
+            cursor.close()
+        
+        logger.info(
+            f"✓ Script executed successfully ({len(statements)} statements, "
+            f"{len(query_ids)} run concurrently)"
+        )
+        return query_ids
     
     def execute_queries_from_file(self, sql_file_path: str) -> List[List[tuple]]:
         """
@@ -221,57 +687,115 @@ class SnowflakeDAL:
         """
         logger.info(f"Executing queries from file: {sql_file_path}")
         
-        with open(sql_file_path, 'r') as f:
-            sql_content = f.read()
-        
-        # Split by semicolon
-        raw_statements = sql_content.split(';')
-        
-        # Clean and filter to only SELECT queries
-        queries = []
-        for stmt in raw_statements:
-            # Remove comment-only lines and clean up
-            cleaned_lines = []
-            for line in stmt.split('\n'):
-                stripped = line.strip()
-                # Skip empty lines and section separators
-                if not stripped or stripped.startswith('-- ===='):
-                    continue
-                # Skip standalone comment lines
-                if not stripped.startswith('--'):
-                    cleaned_lines.append(line)
-            
-            cleaned_stmt = '\n'.join(cleaned_lines).strip()
-            
-            # Only add if it's a SELECT query
-            if cleaned_stmt and cleaned_stmt.upper().startswith('SELECT'):
-                queries.append(cleaned_stmt)
+        statements = _parse_sql_file(sql_file_path, os.stat(sql_file_path).st_mtime)
+        
+        # Only keep SELECT queries (skip USE ... statements)
+        queries = [stmt for stmt in statements if stmt.upper().startswith('SELECT')]
         
         logger.info(f"Found {len(queries)} SELECT queries to execute")
         
-        # Execute each query and collect results
-        all_results = []
+        try:
+            all_results = self.execute_queries_batch(queries)
+        except SnowflakeError as e:
+            # A failing query aborts the whole batch - rerun one by one so
+            # the remaining queries still report their results
+            logger.warning(f"⚠ Batched execution failed ({e}), retrying queries individually")
+            all_results = []
+            
+            with self.get_cursor() as cursor:
+                for i, query in enumerate(queries, 1):
+                    try:
+                        result = self.execute_query(query, fetch=True, cursor=cursor)
+                        if result:
+                            all_results.append(result)
+                        logger.debug(f"✓ Query {i}/{len(queries)} executed")
+                    except SnowflakeError as e:
+                        logger.warning(f"⚠ Query {i} failed: {e}")
+                        # Continue with other queries
+        
+        logger.info(f"✓ Executed {len(queries)} queries successfully")
+        return all_results
+    
+    def execute_queries_batch(self, queries: List[str]) -> List[List[tuple]]:
+        """
+        Execute several queries in a single multi-statement request.
+        Pays one network round-trip instead of one per query.
+        
+        Args:
+            queries: SQL queries (without trailing semicolons)
         
-        for i, query in enumerate(queries, 1):
-            try:
-                result = self.execute_query(query, fetch=True)
+        Returns:
+            List of non-empty result sets, in query order
+        """
+        if not queries:
+            return []
+        
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        try:
+            combined_sql = ";\n".join(queries)
+            cursor.execute(combined_sql, num_statements=len(queries))
+            
+            # Walk the result sets, one per statement
+            all_results = []
+            while True:
+                result = cursor.fetchall()
                 if result:
                     all_results.append(result)
-                logger.debug(f"✓ Query {i}/{len(queries)} executed")
-            except SnowflakeError as e:
-                logger.warning(f"⚠ Query {i} failed: {e}")
-                # Continue with other queries
+                if cursor.nextset() is None:
+                    break
+            
+            logger.debug(f"✓ Executed {len(queries)} queries in one request")
+            return all_results
         
-        logger.info(f"✓ Executed {len(queries)} queries successfully")
-        return all_results
+        finally:
+            cursor.close()
     
-    def table_exists(self, table_name: str, schema: Optional[str] = None) -> bool:
+    def execute_queries_async(self, queries: List[str]) -> List[List[tuple]]:
+        """
+        Run independent queries concurrently as async queries and fetch all results.
+        
+        Args:
+            queries: SQL queries that don't depend on each other
+        
+        Returns:
+            One result set per query (possibly empty), in query order
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        try:
+            # Submit everything first so the queries run in parallel server side
+            query_ids = []
+            for query in queries:
+                cursor.execute_async(query)
+                query_ids.append(cursor.sfqid)
+            
+            all_results = []
+            for query_id in query_ids:
+                cursor.get_results_from_sfqid(query_id)
+                all_results.append(cursor.fetchall())
+            
+            logger.debug(f"✓ Executed {len(queries)} async queries")
+            return all_results
+        
+        finally:
+            cursor.close()
+    
+    def table_exists(
+        self,
+        table_name: str,
+        schema: Optional[str] = None,
+        cursor: Optional[SnowflakeCursor] = None
+    ) -> bool:
         """
         Check if a table exists.
         
         Args:
             table_name: Name of the table
             schema: Schema name (uses default if not provided)
+            cursor: Optional cursor to reuse
         
         Returns:
             True if table exists, False otherwise
@@ -285,16 +809,22 @@ class SnowflakeDAL:
             AND TABLE_NAME = %s
         """
         
-        result = self.execute_query(query, (schema.upper(), table_name.upper()), fetch=True)
+        result = self.execute_query(query, (schema.upper(), table_name.upper()), fetch=True, cursor=cursor)
         return result[0][0] > 0 if result else False
     
-    def get_row_count(self, table_name: str, schema: Optional[str] = None) -> int:
+    def get_row_count(
+        self,
+        table_name: str,
+        schema: Optional[str] = None,
+        cursor: Optional[SnowflakeCursor] = None
+    ) -> int:
         """
         Get row count for a table.
         
         Args:
             table_name: Name of the table
             schema: Schema name (uses default if not provided)
+            cursor: Optional cursor to reuse
         
         Returns:
             Number of rows in the table
@@ -303,37 +833,60 @@ class SnowflakeDAL:
         full_table_name = f"{schema}.{table_name}"
         
         query = f"SELECT COUNT(*) FROM {full_table_name}"
-        result = self.execute_query(query, fetch=True)
+        result = self.execute_query(query, fetch=True, cursor=cursor)
         
         return result[0][0] if result else 0
     
-    def upload_file_to_stage(self, local_file_path: str, stage_name: str) -> None:
+    def upload_file_to_stage(
+        self,
+        local_file_path: str,
+        stage_name: str,
+        file_stream: Optional[BinaryIO] = None,
+        auto_compress: bool = True,
+        parallel: int = SNOWFLAKE_PUT_PARALLEL,
+        cursor: Optional[SnowflakeCursor] = None
+    ) -> None:
         """
-        Upload a local file to Snowflake internal stage using PUT command.
+        Upload local file(s) to Snowflake internal stage using PUT command.
+        Uncompressed files are gzip-compressed client side (already compressed
+        files, e.g. .json.zst, are uploaded as is) in parallel chunks; COPY and
+        stage queries decompress either transparently.
         
         Args:
-            local_file_path: Path to local file
+            local_file_path: Path to local file; may contain wildcards
+                             (e.g. 'data/characters_*.json*') to upload every
+                             matching file in one PUT. With file_stream, only
+                             the file name is used (as the staged file name)
             stage_name: Name of the stage (with @ prefix)
+            file_stream: Optional in-memory stream uploaded instead of reading the file
+            auto_compress: Gzip uncompressed files before upload (AUTO_COMPRESS)
+            parallel: Number of threads uploading file chunks (PARALLEL, 1-99)
+            cursor: Optional cursor to run the PUT on (e.g. one per worker thread)
         
         Raises:
             Exception if upload fails
         """
-        conn = self.connect()
-        cursor = conn.cursor()
-        
-        try:
-            put_command = f"PUT file://{local_file_path} {stage_name} AUTO_COMPRESS=FALSE OVERWRITE=TRUE"
+        with self.get_cursor(cursor) as cur:
+            put_command = (
+                f"PUT file://{local_file_path} {stage_name} PARALLEL={parallel} "
+                f"AUTO_COMPRESS={'TRUE' if auto_compress else 'FALSE'} OVERWRITE=TRUE"
+            )
+            if local_file_path.endswith('.zst'):
+                # Known zstd file: skip client-side compression detection
+                put_command += " SOURCE_COMPRESSION=ZSTD"
             
-            cursor.execute(put_command)
-            result = cursor.fetchone()
+            if file_stream is not None:
+                cur.execute(put_command, file_stream=file_stream)
+            else:
+                cur.execute(put_command)
+            # One result row per uploaded file: (source, target, ..., status, message)
+            results = cur.fetchall()
+            failed = [row for row in results if row[6] != 'UPLOADED']
             
-            if result and result[6] == 'UPLOADED':
-                logger.info(f"✓ Uploaded to stage")
+            if results and not failed:
+                logger.info(f"✓ Uploaded {len(results)} file(s) to stage")
             else:
-                raise Exception(f"Upload failed with status: {result}")
-        
-        finally:
-            cursor.close()
+                raise Exception(f"Upload failed with status: {failed or results}")
     
     def copy_into_from_stage(
         self, 
@@ -341,7 +894,7 @@ class SnowflakeDAL:
         stage_name: str,
         file_pattern: Optional[str] = None,
         transformations: Optional[str] = None,
-        flatten_json_array: bool = False
+        pattern: Optional[str] = None
     ) -> int:
         """
         Copy data from stage into table using COPY INTO command.
@@ -349,76 +902,39 @@ class SnowflakeDAL:
         Args:
             table_name: Target table name (schema.table)
             stage_name: Stage name (with @ prefix)
-            file_pattern: Optional file pattern to match (e.g., 'characters_.*')
+            file_pattern: Optional file path prefix within the stage (e.g., 'characters_'),
+                          also matches the '.gz' file created by PUT AUTO_COMPRESS
             transformations: Optional column transformations in SELECT
-            flatten_json_array: If True, use LATERAL FLATTEN to explode JSON data array
+            pattern: Optional regex over staged file names (COPY PATTERN), so several
+                     files (e.g. '.*characters_.*[.]json.*') load in one command
         
         Returns:
             Number of rows loaded
         """
-        conn = self.connect()
-        cursor = conn.cursor()
+        _validate_load_sql_parts(table_name, stage_name, file_pattern, pattern)
+        
+        copy_cmd = f"COPY INTO {table_name} "
+        
+        if transformations:
+            copy_cmd += f"({transformations}) "
+        
+        copy_cmd += f"FROM {stage_name}"
+        
+        if file_pattern:
+            copy_cmd += f"/{file_pattern}"
+        
+        if pattern:
+            copy_cmd += f" PATTERN = '{pattern}'"
+        
+        copy_cmd += " FILE_FORMAT = (TYPE = 'JSON') MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE"
         
         try:
-            # Build COPY INTO command
-            copy_cmd = f"COPY INTO {table_name} "
-            
-            if transformations:
-                copy_cmd += f"({transformations}) "
-            
-            copy_cmd += f"FROM {stage_name}"
-            
-            if file_pattern:
-                copy_cmd += f"/{file_pattern}"
-            
-            copy_cmd += " FILE_FORMAT = (TYPE = 'JSON') MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE"
-            
-            # If flatten_json_array is True, use two-step process
-            if flatten_json_array:
-                # Step 1: Create temp table and load entire JSON file
-                temp_table = f"{table_name}_temp"
-                stage_path = f"{stage_name}/{file_pattern}" if file_pattern else stage_name
+            with self.get_cursor() as cursor:
+                logger.info(f"Copying data into {table_name}")
+                logger.debug(f"COPY command: {copy_cmd}")
                 
-                logger.info(f"Creating temporary table {temp_table}")
-                cursor.execute(f"CREATE TEMPORARY TABLE {temp_table} (raw_json VARIANT)")
-                
-                logger.info(f"Loading JSON file into temporary table")
-                copy_temp_cmd = f"""
-                COPY INTO {temp_table}
-                FROM {stage_path}
-                FILE_FORMAT = (TYPE = 'JSON')
-                """
-                cursor.execute(copy_temp_cmd)
-                
-                # Step 2: Flatten and insert into target table
-                logger.info(f"Flattening JSON array and inserting into {table_name}")
-                insert_cmd = f"""
-                INSERT INTO {table_name} (id, raw_data, source_file)
-                SELECT 
-                    value:id::INTEGER as id,
-                    value as raw_data,
-                    '{file_pattern}' as source_file
-                FROM {temp_table},
-                LATERAL FLATTEN(input => raw_json:data)
-                """
-                cursor.execute(insert_cmd)
+                cursor.execute(copy_cmd)
                 result = cursor.fetchone()
-                
-                # Clean up temp table
-                cursor.execute(f"DROP TABLE {temp_table}")
-                
-                # Return row count from INSERT
-                if result:
-                    rows_loaded = result[0] if isinstance(result[0], int) else 0
-                    logger.info(f"✓ Loaded {rows_loaded} rows into {table_name}")
-                    return rows_loaded
-                return 0
-            
-            logger.info(f"Copying data into {table_name}")
-            logger.debug(f"COPY command: {copy_cmd}")
-            
-            cursor.execute(copy_cmd)
-            result = cursor.fetchone()
             
             # COPY INTO returns (file, status, rows_parsed, rows_loaded, ...)
             if result:
@@ -431,66 +947,256 @@ class SnowflakeDAL:
         except Exception as e:
             logger.error(f"Failed to copy data: {e}")
             raise
+    
+    def insert_flattened_from_stage(
+        self,
+        table_name: str,
+        stage_name: str,
+        file_pattern: Optional[str] = None,
+        pattern: Optional[str] = None,
+        file_format: Optional[str] = None
+    ) -> int:
+        """
+        Load staged JSON documents by exploding their 'data' array into rows.
         
-        finally:
-            cursor.close()
+        Queries the staged files and flattens them in one INSERT ... SELECT
+        (COPY transformations can't FLATTEN), then removes the loaded files.
+        
+        Args:
+            table_name: Target table name (schema.table) with id, raw_data, source_file
+            stage_name: Stage name (with @ prefix)
+            file_pattern: Optional path prefix within the stage
+            pattern: Optional regex over staged file names, so several files
+                     (e.g. '.*characters_[^/]*[.]json[^/]*') load in one command
+            file_format: Optional named file format (defaults to the stage's own)
+        
+        Returns:
+            Number of rows loaded
+        """
+        _validate_load_sql_parts(table_name, stage_name, file_pattern, pattern, file_format)
+        
+        stage_path = f"{stage_name}/{file_pattern}" if file_pattern else stage_name
+        stage_options = ", ".join(
+            option for option in (
+                f"FILE_FORMAT => '{file_format}'" if file_format else "",
+                f"PATTERN => '{pattern}'" if pattern else "",
+            ) if option
+        )
+        stage_source = f"{stage_path} ({stage_options})" if stage_options else stage_path
+        
+        # A pattern can match several dumps of the same entity: keep one row
+        # per id, from the latest (timestamped) file name
+        insert_cmd = f"""
+        INSERT INTO {table_name} (id, raw_data, source_file)
+        SELECT 
+            f.value:id::INTEGER as id,
+            f.value as raw_data,
+            METADATA$FILENAME as source_file
+        FROM {stage_source} t,
+        LATERAL FLATTEN(input => t.$1:data) f
+        QUALIFY ROW_NUMBER() OVER (
+            PARTITION BY f.value:id ORDER BY METADATA$FILENAME DESC
+        ) = 1
+        """
+        
+        # Remove the loaded files (what PURGE does for COPY)
+        remove_cmd = f"REMOVE {stage_path}"
+        if pattern:
+            remove_cmd += f" PATTERN = '{pattern}'"
+        
+        try:
+            with self.get_cursor() as cursor:
+                logger.info(f"Flattening staged JSON file(s) into {table_name}")
+                logger.debug(f"INSERT command: {insert_cmd}")
+                cursor.execute(insert_cmd)
+                result = cursor.fetchone()
+                
+                # The rows are already in, so a failed cleanup is only logged
+                try:
+                    cursor.execute(remove_cmd)
+                except Exception as e:
+                    logger.warning(f"⚠ Failed to remove loaded files from {stage_path}: {e}")
+            
+            # INSERT returns the number of rows inserted
+            rows_loaded = result[0] if result and isinstance(result[0], int) else 0
+            logger.info(f"✓ Loaded {rows_loaded} rows into {table_name}")
+            return rows_loaded
+        
+        except Exception as e:
+            logger.error(f"Failed to load flattened data: {e}")
+            raise
+    
+    def _copy_json_lines(self, table_name: str, stage_name: str, chunk_folder: str) -> int:
+        """
+        Load staged NDJSON chunks (one record per line) with a single COPY.
+        
+        The chunks are purged once loaded; source_file is the name of the
+        folder holding them ('<LOAD_CHUNK_FOLDER>/<source_file>/').
+        
+        Args:
+            table_name: Target table name (schema.table) with id, raw_data, source_file
+            stage_name: Stage name (with @ prefix)
+            chunk_folder: Chunk folder within the stage
+        
+        Returns:
+            Number of rows loaded
+        """
+        _validate_load_sql_parts(table_name, stage_name, chunk_folder)
+        
+        copy_cmd = f"""
+        COPY INTO {table_name} (id, raw_data, source_file)
+        FROM (
+            SELECT $1:id::INTEGER, $1, SPLIT_PART(METADATA$FILENAME, '/', 2)
+            FROM {stage_name}/{chunk_folder}
+        )
+        FILE_FORMAT = (TYPE = 'JSON')
+        PURGE = TRUE
+        """
+        
+        try:
+            with self.get_cursor() as cursor:
+                logger.info(f"Copying staged NDJSON chunks into {table_name}")
+                cursor.execute(copy_cmd)
+                
+                # One result row per file: (file, status, rows_parsed, rows_loaded, ...)
+                rows_loaded = sum(row[3] for row in cursor.fetchall() if len(row) > 3)
+            
+            logger.info(f"✓ Loaded {rows_loaded} rows into {table_name}")
+            return rows_loaded
+        
+        except Exception as e:
+            logger.error(f"Failed to copy data: {e}")
+            raise
+    
+    def _stage_json_chunks(self, records: Iterator[Dict[str, Any]], stage_path: str) -> int:
+        """
+        Write records as zstd NDJSON chunk files and PUT them to the stage.
+        
+        Worker threads serialize, write and upload each chunk (on their own
+        cursor) while the caller keeps parsing, so reading, writing and
+        uploading overlap. At most 2 * LOAD_CHUNK_WORKERS chunks are in memory.
+        
+        Args:
+            records: Records to stage
+            stage_path: Stage location for the chunks (e.g. '@RAW.raw_data_stage/x')
+        
+        Returns:
+            Number of chunk files uploaded
+        """
+        conn = self.connect()
+        
+        with tempfile.TemporaryDirectory(prefix="raw_chunks_") as temp_dir:
+            
+            def write_and_put(chunk_number: int, chunk: List[Dict[str, Any]]) -> None:
+                chunk_path = os.path.join(temp_dir, f"chunk_{chunk_number:05d}.json.zst")
+                with open(chunk_path, 'wb') as f:
+                    f.write(zstd_compress(b"\n".join(orjson.dumps(record) for record in chunk)))
+                
+                with conn.cursor() as cursor:
+                    self.upload_file_to_stage(chunk_path, stage_path, parallel=1, cursor=cursor)
+                os.remove(chunk_path)
+            
+            in_flight: deque = deque()
+            chunk_count = 0
+            
+            with ThreadPoolExecutor(max_workers=LOAD_CHUNK_WORKERS, thread_name_prefix="raw-chunk") as executor:
+                while True:
+                    chunk = list(islice(records, LOAD_CHUNK_ROWS))
+                    if not chunk:
+                        break
+                    
+                    in_flight.append(executor.submit(write_and_put, chunk_count, chunk))
+                    chunk_count += 1
+                    
+                    # Backpressure: don't parse further ahead than the workers
+                    if len(in_flight) >= 2 * LOAD_CHUNK_WORKERS:
+                        in_flight.popleft().result()
+                
+                for future in in_flight:
+                    future.result()
+        
+        return chunk_count
     
     def load_json_to_raw_table(
         self,
         json_file_path: str,
         table_name: str,
-        stage_name: str = "@raw_data_stage"
+        stage_name: str = "@RAW.raw_data_stage"
     ) -> int:
         """
         Complete workflow: Upload JSON file and load into raw table.
         Handles JSON files with array of records wrapped in metadata.
         
+        Records are streamed into NDJSON chunks (LOAD_CHUNK_ROWS each) that are
+        PUT in parallel and loaded with a single COPY; small files
+        (< SMALL_LOAD_ROW_THRESHOLD records) are inserted directly, where the
+        staging overhead would dominate.
+        
         Args:
             json_file_path: Path to JSON file
             table_name: Target table name
-            stage_name: Stage name (default: @raw_data_stage)
+            stage_name: Stage name (default: @RAW.raw_data_stage)
         
         Returns:
             Number of rows loaded
         """
-        import json
         from pathlib import Path
         
         logger.info(f"Loading {json_file_path} into {table_name}")
         
-        # Read and parse JSON file to extract individual records
-        with open(json_file_path, 'r') as f:
-            data = json.load(f)
-        
-        records = data.get('data', [])
+        # Stream records (plain or .json.zst); the file is never loaded whole
+        records_iter = iter_json_items(Path(json_file_path))
+        records = list(islice(records_iter, SMALL_LOAD_ROW_THRESHOLD))
         source_file = Path(json_file_path).name
         
         if not records:
             logger.warning(f"No records found in {json_file_path}")
             return 0
         
+        if len(records) >= SMALL_LOAD_ROW_THRESHOLD:
+            logger.info(f"Found {SMALL_LOAD_ROW_THRESHOLD}+ records, loading via stage in chunks")
+            
+            # Chunks go to a stage folder named after the source file
+            chunk_folder = f"{LOAD_CHUNK_FOLDER}/{source_file}/"
+            _validate_load_sql_parts(table_name, stage_name, chunk_folder)
+            
+            try:
+                chunk_count = self._stage_json_chunks(
+                    chain(records, records_iter),
+                    f"{stage_name}/{chunk_folder}"
+                )
+            except Exception:
+                # Don't leave a partial chunk set behind for the next load
+                try:
+                    self.execute_query(f"REMOVE {stage_name}/{chunk_folder}")
+                except Exception as e:
+                    logger.warning(f"⚠ Failed to remove staged chunks in {chunk_folder}: {e}")
+                raise
+            logger.info(f"✓ Staged {chunk_count} chunk(s) of up to {LOAD_CHUNK_ROWS} records")
+            
+            return self._copy_json_lines(table_name, stage_name, chunk_folder)
+        
         logger.info(f"Found {len(records)} records to load")
         
-        # Insert records one by one (simpler for this use case)
+        # Small file: insert all records with one multi-row INSERT
+        # (executemany rewrites the VALUES clause into a single statement;
+        # PARSE_JSON is applied in the SELECT as it is not allowed in VALUES)
+        insert_sql = f"""
+        INSERT INTO {table_name} (id, raw_data, source_file)
+        SELECT column1, PARSE_JSON(column2), column3
+        FROM VALUES (%s, %s, %s)
+        """
+        params = [
+            (record.get('id'), orjson.dumps(record).decode(), source_file)
+            for record in records
+        ]
+        
         conn = self.connect()
         cursor = conn.cursor()
-        rows_loaded = 0
         
         try:
-            for record in records:
-                record_id = record.get('id')
-                
-                # Insert with PARSE_JSON to convert string to VARIANT
-                insert_sql = f"""
-                INSERT INTO {table_name} (id, raw_data, source_file)
-                VALUES (%s, PARSE_JSON(%s), %s)
-                """
-                
-                cursor.execute(
-                    insert_sql,
-                    (record_id, json.dumps(record), source_file)
-                )
-                rows_loaded += 1
+            cursor.executemany(insert_sql, params)
+            rows_loaded = cursor.rowcount
             
             logger.info(f"✓ Successfully loaded {rows_loaded} rows into {table_name}")
             return rows_loaded
@@ -539,9 +1245,9 @@ if __name__ == "__main__":
     """
     import sys
     
-    logger.info("=" * 60)
-    logger.info("Testing Snowflake Connection")
-    logger.info("=" * 60)
+    setup_logging(LOG_LEVEL)
+    
+    logger.info(format_banner("Testing Snowflake Connection"))
     
     try:
         dal = SnowflakeDAL()
@@ -549,14 +1255,10 @@ if __name__ == "__main__":
         dal.close()
         
         if success:
-            logger.info("\n" + "=" * 60)
-            logger.info("  ✓ Connection test PASSED")
-            logger.info("=" * 60)
+            logger.info(format_banner("  ✓ Connection test PASSED"))
             sys.exit(0)
         else:
-            logger.error("\n" + "=" * 60)
-            logger.error("  ✗ Connection test FAILED")
-            logger.error("=" * 60)
+            logger.error(format_banner("  ✗ Connection test FAILED"))
             sys.exit(1)
     
     except Exception as e:
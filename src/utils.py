@@ -2,16 +2,28 @@
 Utility functions for the Rick and Morty data pipeline.
 """
 
-import json
+import fnmatch
 import logging
-from datetime import datetime
+import os
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Tuple
+
+import ijson
+import orjson
+import zstandard
+
+# zstd level 3: fast, and shrinks the repetitive API JSON (URLs) several times
+ZSTD_LEVEL = 3
+
+_UTC = timezone.utc
 
 
 def setup_logging(log_level: str = "INFO") -> logging.Logger:
     """
     Configure logging for the pipeline.
+    Idempotent: once the root logger has handlers, later calls change nothing
+    (modules should use logging.getLogger(__name__) instead of calling this).
     
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -19,6 +31,9 @@ def setup_logging(log_level: str = "INFO") -> logging.Logger:
     Returns:
         Configured logger instance
     """
+    if logging.getLogger().handlers:
+        return logging.getLogger(__name__)
+    
     logging.basicConfig(
         level=getattr(logging, log_level.upper()),
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -27,9 +42,37 @@ def setup_logging(log_level: str = "INFO") -> logging.Logger:
     return logging.getLogger(__name__)
 
 
+def serialize_json(data: Any) -> bytes:
+    """
+    Serialize data to indented UTF-8 JSON bytes with orjson.
+    
+    Args:
+        data: Data to serialize (must be JSON serializable)
+    
+    Returns:
+        JSON document as bytes
+    """
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+
+def zstd_compress(content: bytes) -> bytes:
+    """
+    Compress bytes into a single zstd frame.
+    
+    Args:
+        content: Bytes to compress
+    
+    Returns:
+        Compressed bytes
+    """
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(content)
+
+
 def save_json_to_file(data: Any, file_path: Path) -> None:
     """
     Save data as JSON to a file.
+    Serializes with orjson and writes the UTF-8 bytes in a single call.
+    Files ending in '.zst' are zstd-compressed.
     
     Args:
         data: Data to save (must be JSON serializable)
@@ -37,35 +80,109 @@ def save_json_to_file(data: Any, file_path: Path) -> None:
     """
     file_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    content = serialize_json(data)
+    if file_path.suffix == '.zst':
+        content = zstd_compress(content)
+    
+    with open(file_path, 'wb') as f:
+        f.write(content)
+
+
+def load_json_from_file(file_path: Path) -> Any:
+    """
+    Load JSON data from a file (zstd-compressed if it ends in '.zst').
+    
+    Args:
+        file_path: Path to the JSON file
+    
+    Returns:
+        Parsed JSON data
+    """
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    
+    if Path(file_path).suffix == '.zst':
+        content = zstandard.ZstdDecompressor().decompress(content)
+    
+    return orjson.loads(content)
+
+
+def iter_json_items(file_path: Path, prefix: str = 'data.item') -> Iterator[Any]:
+    """
+    Stream items out of a JSON file (zstd-compressed if it ends in '.zst')
+    without loading the whole document.
+    
+    Args:
+        file_path: Path to the JSON file
+        prefix: ijson prefix of the items to yield (default: records of 'data')
+    
+    Yields:
+        Parsed items, one at a time
+    """
+    with open(file_path, 'rb') as f:
+        stream = zstandard.ZstdDecompressor().stream_reader(f) if Path(file_path).suffix == '.zst' else f
+        yield from ijson.items(stream, prefix, use_float=True)
+
+
+def scan_files(directory: Path, pattern: str) -> List[Tuple[float, str]]:
+    """
+    List files matching a pattern in a single directory pass.
+    
+    Args:
+        directory: Directory to scan
+        pattern: File pattern to match (e.g., 'characters_*.json')
+    
+    Returns:
+        List of (mtime, path) tuples, empty if the directory doesn't exist
+    """
+    if not directory.is_dir():
+        return []
+    
+    with os.scandir(directory) as entries:
+        return [
+            (entry.stat(follow_symlinks=False).st_mtime, entry.path)
+            for entry in entries
+            if entry.is_file(follow_symlinks=False) and fnmatch.fnmatch(entry.name, pattern)
+        ]
 
 
 def get_timestamp() -> str:
     """
-    Get current timestamp as ISO format string.
+    Get current UTC timestamp as ISO format string.
+    
+    Returns:
+        ISO formatted timestamp with a 'Z' suffix (e.g. '2024-01-01T10:00:00.123456Z')
+    """
+    return datetime.now(_UTC).isoformat().replace('+00:00', 'Z')
+
+
+def format_banner(title: str, *lines: str, char: str = "=") -> str:
+    """
+    Build a multi-line banner so it can be emitted with a single log/print call.
+    
+    Args:
+        title: Banner title
+        *lines: Optional body lines, shown below the title
+        char: Character used for the separator rules
     
     Returns:
-        ISO formatted timestamp
+        Banner text starting on a new line
     """
-    return datetime.utcnow().isoformat()
+    rule = char * 60
+    body = "".join(f"\n{line}" for line in lines)
+    rule_after_body = f"\n{rule}" if lines else ""
+    return f"\n{rule}\n{title}\n{rule}{body}{rule_after_body}"
 
 
 def print_summary(title: str, stats: Dict[str, Any]) -> None:
     """
-    Print a formatted summary of pipeline statistics.
+    Print a formatted summary of pipeline statistics (in a single write).
     
     Args:
         title: Title for the summary
         stats: Dictionary of statistics to display
     """
-    print("\n" + "=" * 60)
-    print(f"  {title}")
-    print("=" * 60)
-    
-    for key, value in stats.items():
-        print(f"  {key:.<40} {value}")
-    
-    print("=" * 60 + "\n")
+    lines = [f"  {key:.<40} {value}" for key, value in stats.items()]
+    print(format_banner(f"  {title}", *lines) + "\n")
 
 